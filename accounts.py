@@ -0,0 +1,114 @@
+from flask import Blueprint, flash, redirect, render_template, request, url_for
+from flask_login import current_user, login_required, login_user, logout_user
+
+from images import save_image
+from models import db, Order, User
+from passwords import hash_password, needs_rehash, verify_password
+
+# 👤 Sign-up, login and the customer's own dashboard/profile
+bp = Blueprint("accounts", __name__)
+
+
+@bp.route("/register", methods=["GET", "POST"])
+def register():
+    if request.method == "POST":
+        username = request.form.get("username")
+        email = request.form.get("email")
+        password = request.form.get("password")
+
+        if not username or not email or not password:
+            flash("⚠️ Please fill in all fields.")
+            return redirect(url_for("accounts.register"))
+
+        # Check if username or email already exist
+        existing_user = User.query.filter(
+            (User.username == username) | (User.email == email)
+        ).first()
+        if existing_user:
+            flash("⚠️ Username or email already exists.")
+            return redirect(url_for("accounts.register"))
+
+        hashed_pw = hash_password(password)
+        new_user = User(username=username, email=email, password=hashed_pw)
+        db.session.add(new_user)
+        db.session.commit()
+
+        flash("✅ Account created successfully! Please log in.")
+        return redirect(url_for("accounts.login"))
+
+    return render_template("register.html")
+
+
+@bp.route("/login", methods=["GET","POST"])
+def login():
+  if request.method == "POST":
+    username = request.form["username"]
+    password = request.form["password"]
+    user = User.query.filter_by(username=username).first()
+    if user and verify_password(user.password, password):
+      if needs_rehash(user.password):
+        # 🔑 Upgrade to the current PASSWORD_HASH_METHOD while we have the plaintext
+        user.password = hash_password(password)
+        db.session.commit()
+      login_user(user)
+      return redirect(url_for("storefront.index"))
+    flash("Invalid credentials")
+  return render_template("login.html")
+
+
+@bp.route("/logout")
+@login_required
+def logout():
+  logout_user()
+  return redirect(url_for("storefront.index"))
+
+
+@bp.route("/dashboard")
+@login_required
+def dashboard():
+    orders = Order.query.filter_by(user_id=current_user.id, is_paid=True).order_by(Order.date.desc()).all()
+    total_spent = sum(order.total for order in orders)
+    total_orders = len(orders)
+    delivered_orders = len([o for o in orders if o.shipping_status == "Delivered"])
+
+    return render_template(
+        "dashboard.html",
+        user=current_user,
+        orders=orders,
+        total_spent=total_spent,
+        total_orders=total_orders,
+        delivered_orders=delivered_orders,
+    )
+
+
+def allowed_file(filename):
+    ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif"}
+    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+@bp.route("/edit_profile", methods=["GET", "POST"])
+@login_required
+def edit_profile():
+    if request.method == "POST":
+        # current_user is a cached, read-only principal; edit the row itself
+        user = db.session.get(User, current_user.id)
+        user.username = request.form["username"]
+        user.email = request.form["email"]
+
+        if request.form["password"]:
+            user.password = hash_password(request.form["password"])
+
+        # Handle avatar upload
+        file = request.files.get("avatar")
+        if file and allowed_file(file.filename):
+            try:
+                user.avatar = save_image(file, "UPLOAD_FOLDER")  # content digest, see images.py
+            except ValueError:
+                flash("⚠️ That file is not an image we can read.")
+                return redirect(url_for("accounts.edit_profile"))
+
+        db.session.commit()
+        flash("Profile updated successfully!", "success")
+        return redirect(url_for("accounts.dashboard"))
+
+    return render_template("edit_profile.html")
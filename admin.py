@@ -0,0 +1,326 @@
+from datetime import datetime
+
+from flask import Blueprint, flash, redirect, render_template, request, url_for
+from flask_login import current_user, login_required
+from sqlalchemy.orm import joinedload
+
+from fragment_cache import cache_stats
+from images import save_image
+from instrumentation import endpoint_stats
+from inventory import reserved_units
+from mailer import enqueue_email
+from models import db, CatalogVersion, DailySales, Order, Product, User, SHIPPING_STAGES
+from search import index_product, remove_product
+from user_cache import cache_stats as user_cache_stats
+
+# 🛠️ Catalog and order management
+bp = Blueprint("admin", __name__)
+
+
+@bp.route("/admin/products")
+@login_required
+def admin_products():
+    if not current_user.is_admin:
+        flash("Access denied. Admins only.")
+        return redirect(url_for("storefront.index"))
+
+    products = Product.query.all()
+    held = reserved_units([product.id for product in products])
+    return render_template("admin_products.html", products=products, held=held)
+
+
+@bp.route("/admin/add_product", methods=["GET", "POST"])
+@login_required
+def add_product():
+    if not current_user.is_admin:
+        flash("Access denied. Admins only.")
+        return redirect(url_for("storefront.index"))
+
+    if request.method == "POST":
+        name = request.form["name"]
+        price = float(request.form["price"])
+        description = request.form["description"]
+        stock = _stock_from_form()
+        if stock is False:
+            flash("⚠️ Stock must be a whole number, 0 or more (blank = not tracked).")
+            return redirect(request.url)
+
+        image_file = request.files.get("image")
+        image_filename = None
+
+        if image_file and image_file.filename != "":
+            # 🖼️ Stored as resized WebP/JPEG variants, named by content hash
+            try:
+                image_filename = f"uploads/products/{save_image(image_file, 'PRODUCT_UPLOAD_FOLDER')}"
+            except ValueError:
+                flash("⚠️ That file is not an image we can read.")
+                return redirect(request.url)
+
+        new_product = Product(
+            name=name,
+            price=price,
+            description=description,
+            image=image_filename,
+            stock=stock,
+        )
+
+        db.session.add(new_product)
+        index_product(new_product)
+        CatalogVersion.bump()
+        db.session.commit()
+        flash("✅ Product added successfully with image!")
+        return redirect(url_for("admin.admin_products"))
+
+    return render_template("add_product.html")
+
+
+@bp.route("/admin/orders")
+@login_required
+def admin_orders():
+    if not current_user.is_admin:
+        flash("Access denied. Admins only.")
+        return redirect(url_for("storefront.index"))
+
+    # Owner is joined in, so the table renders in one query however many orders there are.
+    # Unpaid rows are open, cancelled or expired checkouts, not orders to fulfil.
+    orders = (
+        Order.query.options(joinedload(Order.user))
+        .filter(Order.is_paid.is_(True))
+        .order_by(Order.date.desc())
+        .all()
+    )
+    return render_template("admin_orders.html", orders=orders, shipping_stages=SHIPPING_STAGES)
+
+
+@bp.route("/admin/edit_product/<int:product_id>", methods=["GET", "POST"])
+@login_required
+def edit_product(product_id):
+    if not current_user.is_admin:
+        flash("Access denied. Admins only.")
+        return redirect(url_for("storefront.index"))
+
+    product = Product.query.get_or_404(product_id)
+
+    if request.method == "POST":
+        stock = _stock_from_form()
+        if stock is False:
+            flash("⚠️ Stock must be a whole number, 0 or more (blank = not tracked).")
+            return redirect(request.url)
+        product.name = request.form["name"]
+        product.price = float(request.form["price"])
+        product.description = request.form["description"]
+        product.stock = stock
+
+        # ✅ Handle image upload (optional)
+        image_file = request.files.get("image")
+        if image_file and image_file.filename != "":
+            try:
+                product.image = f"uploads/products/{save_image(image_file, 'PRODUCT_UPLOAD_FOLDER')}"
+            except ValueError:
+                flash("⚠️ That file is not an image we can read.")
+                return redirect(request.url)
+
+        index_product(product)
+        CatalogVersion.bump()
+        db.session.commit()
+        flash("✅ Product updated successfully!")
+        return redirect(url_for("admin.admin_products"))
+
+    held = reserved_units([product.id]).get(product.id, 0)
+    return render_template("edit_product.html", product=product, held=held)
+
+
+@bp.route("/admin/update_shipping/<int:order_id>", methods=["POST"])
+@login_required
+def update_shipping(order_id):
+    if not current_user.is_admin:
+        flash("Access denied.")
+        return redirect(url_for("storefront.index"))
+
+    order = Order.query.options(joinedload(Order.user)).filter_by(id=order_id).first_or_404()
+    new_status = request.form.get("status")
+    user = order.user
+
+    if new_status not in SHIPPING_STAGES:
+        flash("No shipping status selected.")
+        return redirect(url_for("admin.admin_orders"))
+
+    # 🚫 An unpaid order is a checkout that never completed: nothing to ship
+    if not order.is_paid:
+        flash(f"⚠️ Order #{order.id} is not paid. No email sent.")
+        return redirect(url_for("admin.admin_orders"))
+
+    # 🚫 Avoid resending the same stage
+    if order.shipping_status == new_status:
+        flash(f"⚠️ Order #{order.id} is already marked as '{new_status}'. No email sent.")
+        return redirect(url_for("admin.admin_orders"))
+
+    # Record timeline events
+    stage_index, date_column = SHIPPING_STAGES[new_status]
+    order.shipping_status = new_status
+    order.shipping_stage_index = stage_index
+    setattr(order, date_column, datetime.utcnow())
+
+    # 📨 Queue the notification (only once per new stage) in the same commit
+    enqueue_email(
+        user.email,
+        f"📦 Your Flask Shop Order #{order.id} is now {new_status}",
+        render_template("email_shipping_update.html", order=order, user=user),
+    )
+    db.session.commit()
+
+    flash(f"🚚 Order #{order.id} updated to '{new_status}'. Email queued.")
+    return redirect(url_for("admin.admin_orders"))
+
+
+@bp.route("/admin/update_shipping/bulk", methods=["POST"])
+@login_required
+def bulk_update_shipping():
+    if not current_user.is_admin:
+        flash("Access denied.")
+        return redirect(url_for("storefront.index"))
+
+    new_status = request.form.get("status")
+    order_ids = request.form.getlist("order_ids", type=int)
+    if new_status not in SHIPPING_STAGES:
+        flash("No shipping status selected.")
+        return redirect(url_for("admin.admin_orders"))
+    if not order_ids:
+        flash("No orders selected.")
+        return redirect(url_for("admin.admin_orders"))
+
+    # 🚚 One UPDATE for the whole selection; unpaid orders and orders already
+    # at this stage are skipped (and get no email), same as the single-order path
+    stage_index, date_column = SHIPPING_STAGES[new_status]
+    updated_ids = db.session.scalars(
+        db.update(Order)
+        .where(
+            Order.id.in_(order_ids),
+            Order.is_paid.is_(True),
+            db.or_(Order.shipping_status.is_(None), Order.shipping_status != new_status),
+        )
+        .values({
+            "shipping_status": new_status,
+            "shipping_stage_index": stage_index,
+            date_column: datetime.utcnow(),
+        })
+        .returning(Order.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    # 📨 Queue every notification in the same commit; the mail worker sends
+    # the batch over one SMTP connection
+    orders = (
+        Order.query.options(joinedload(Order.user))
+        .filter(Order.id.in_(updated_ids))
+        .populate_existing()
+        .all()
+    ) if updated_ids else []
+    for order in orders:
+        enqueue_email(
+            order.user.email,
+            f"📦 Your Flask Shop Order #{order.id} is now {new_status}",
+            render_template("email_shipping_update.html", order=order, user=order.user),
+        )
+    db.session.commit()
+
+    skipped = len(set(order_ids)) - len(orders)
+    flash(
+        f"🚚 {len(orders)} order(s) updated to '{new_status}'. Emails queued."
+        + (f" {skipped} unpaid or already at that stage were skipped." if skipped else "")
+    )
+    return redirect(url_for("admin.admin_orders"))
+
+
+@bp.route("/admin/delete_product/<int:product_id>")
+@login_required
+def delete_product(product_id):
+    if not current_user.is_admin:
+        flash("Access denied. Admins only.")
+        return redirect(url_for("storefront.index"))
+
+    product = Product.query.get_or_404(product_id)
+    remove_product(product.id)
+    db.session.delete(product)
+    CatalogVersion.bump()
+    db.session.commit()
+    flash("🗑️ Product deleted.")
+    return redirect(url_for("admin.admin_products"))
+
+
+@bp.route("/admin/dashboard")
+@login_required
+def admin_dashboard():
+    if not current_user.is_admin:
+        flash("Access denied. Admins only.")
+        return redirect(url_for("storefront.index"))
+
+    # 📊 Totals come from SQL aggregates and the daily_sales rollup, never a scan of every order row
+    total_users = db.session.scalar(db.select(db.func.count(User.id)))
+    total_products = db.session.scalar(db.select(db.func.count(Product.id)))
+    total_orders = db.session.scalar(db.select(db.func.count(Order.id)).where(Order.is_paid.is_(True)))
+    total_revenue = db.session.scalar(db.select(db.func.coalesce(db.func.sum(DailySales.revenue), 0)))
+
+    # For chart data (revenue for the last 14 days with sales)
+    days = DailySales.query.order_by(DailySales.day.desc()).limit(14).all()[::-1]
+    chart_labels = [d.day.strftime("%Y-%m-%d") for d in days]
+    chart_data = [d.revenue for d in days]
+
+    return render_template(
+        "admin_dashboard.html",
+        total_users=total_users,
+        total_products=total_products,
+        total_orders=total_orders,
+        total_revenue=total_revenue,
+        chart_labels=chart_labels,
+        chart_data=chart_data
+    )
+
+
+@bp.route("/admin/perf")
+@login_required
+def admin_perf():
+    if not current_user.is_admin:
+        flash("Access denied. Admins only.")
+        return redirect(url_for("storefront.index"))
+
+    return render_template(
+        "admin_perf.html", stats=endpoint_stats(), fragment_cache=cache_stats(),
+        user_cache=user_cache_stats(),
+    )
+
+
+@bp.route("/update_stock/<int:product_id>", methods=["POST"])
+@login_required
+def update_stock(product_id):
+    if not current_user.is_admin:
+        flash("Access denied. Admins only.")
+        return redirect(url_for("storefront.index"))
+
+    product = Product.query.get_or_404(product_id)
+    new_stock = _stock_from_form()
+
+    if new_stock is not False:
+        product.stock = new_stock
+        CatalogVersion.bump()
+        db.session.commit()
+        left = "not tracked" if new_stock is None else f"now {new_stock}"
+        flash(f"✅ Stock updated for {product.name} — {left}", "success")
+    else:
+        flash("⚠️ Invalid stock value", "danger")
+
+    return redirect(url_for("admin.admin_products"))
+
+
+def _stock_from_form():
+    # 📦 Units free to sell: anything held by an open checkout is already off
+    # this figure and comes back on top of it if that checkout is abandoned.
+    # Blank means "not tracked" (NULL, never sold out); False if invalid
+    raw = request.form.get("stock", "").strip()
+    if not raw:
+        return None
+    try:
+        stock = int(raw)
+    except ValueError:
+        return False
+    return stock if stock >= 0 else False
@@ -0,0 +1,94 @@
+from flask import abort, current_app, jsonify, request, url_for
+
+from conditional import conditional, page_etag
+from images import image_url
+from models import db, CatalogVersion, Product
+from pagination import keyset_paginate
+
+# 📱 Read-only catalog API. Rows are selected as plain column tuples (no ORM
+# objects, no identity map) and only the columns a client asks for via
+# ?fields= are read at all.
+FIELDS = ("id", "name", "price", "description", "image", "stock", "updated_at")
+MAX_LIMIT = 100
+
+
+def _error(status, message):
+    response = jsonify(error=message)
+    response.status_code = status
+    abort(response)
+
+
+def _fields():
+    requested = request.args.get("fields")
+    if not requested:
+        return FIELDS
+    fields = [field.strip() for field in requested.split(",") if field.strip()]
+    unknown = sorted(set(fields) - set(FIELDS))
+    if unknown:
+        _error(400, f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(FIELDS)}")
+    # id is always returned: it is the cursor and the key for /products/<id>
+    return ("id", *dict.fromkeys(field for field in fields if field != "id"))
+
+
+def _columns(fields):
+    return [Product.__table__.c[field] for field in fields]
+
+
+def _serialize(row, fields):
+    item = dict(zip(fields, row))
+    if item.get("image"):
+        item["image"] = image_url(item["image"])
+    if item.get("updated_at"):
+        item["updated_at"] = item["updated_at"].isoformat() + "Z"
+    return item
+
+
+def list_products():
+    fields = _fields()
+    limit = min(max(request.args.get("limit", current_app.config["PRODUCTS_PER_PAGE"], type=int), 1), MAX_LIMIT)
+    after = request.args.get("after", type=int)
+    before = request.args.get("before", type=int)
+
+    # 🔁 Same validators as the storefront: polling an unchanged catalog is a
+    # 304 after a primary-key read and one index seek
+    version, latest = CatalogVersion.validators()
+
+    def render():
+        page = keyset_paginate(
+            db.select(*_columns(fields)), Product.id,
+            per_page=limit, after=after, before=before, scalars=False,
+        )
+        links = {}
+        if page.next_cursor is not None:
+            links["next"] = url_for("api_products", after=page.next_cursor, limit=limit, fields=request.args.get("fields"))
+        if page.prev_cursor is not None:
+            links["prev"] = url_for("api_products", before=page.prev_cursor, limit=limit, fields=request.args.get("fields"))
+        return jsonify(
+            data=[_serialize(row, fields) for row in page.items],
+            next_cursor=page.next_cursor,
+            prev_cursor=page.prev_cursor,
+            links=links,
+        )
+
+    return conditional(page_etag("api:products", version, latest, fields, limit, after, before), None, render)
+
+
+def get_product(product_id):
+    fields = _fields()
+    row = db.session.execute(
+        db.select(Product.updated_at, *_columns(fields)).where(Product.id == product_id)
+    ).first()
+    if row is None:
+        _error(404, f"Product {product_id} not found")
+
+    updated_at, values = row[0], row[1:]
+    return conditional(
+        page_etag("api:product", product_id, updated_at, fields),
+        updated_at,
+        lambda: jsonify(_serialize(values, fields)),
+    )
+
+
+def init_app(app):
+    app.add_url_rule("/api/v1/products", "api_products", list_products)
+    app.add_url_rule("/api/v1/products/<int:product_id>", "api_product", get_product)
@@ -10,37 +10,86 @@ from dotenv import load_dotenv
 from flask import Flask
 from flask_login import LoginManager
 from flask_mail import Mail
-from flask_migrate import Migrate
 from config import Config
 from models import db  # ✅ Now Flask will find this correctly
 
 # ✅ Load environment variables
 load_dotenv()
 
-# ✅ Initialize Flask app
-app = Flask(
-    __name__,
-    template_folder="templates",
-    static_folder= "static"
-)
-app.config.from_object(Config)
+# ✅ Extensions are created once and bound to each app in create_app()
+mail = Mail()
+login_manager = LoginManager()
 
-# ✅ Initialize extensions
-db.init_app(app)
-mail = Mail(app)
-login_manager = LoginManager(app)
-migrate = Migrate(app, db)
 
 @login_manager.user_loader
 def load_user(user_id):
-    from models import User
-    return db.session.get(User, int(user_id))
+    # 👤 Cached read-only principal rather than a User row per request
+    from user_cache import load_principal
+    return load_principal(int(user_id))
+
+
+def create_app(config_class=Config, migrations=None):
+    """Build the Flask app.
+
+    Nothing here touches the database or imports WeasyPrint/Stripe (they
+    load on first use), so ``flask db upgrade`` and a fresh gunicorn worker
+    start quickly; gunicorn.conf.py preloads the result in the master.
+    ``migrations`` registers Flask-Migrate; by default only when running
+    under the ``flask`` command, since Alembic is a large import that web
+    workers never use.
+    """
+    app = Flask(
+        __name__,
+        template_folder="templates",
+        static_folder= "static"
+    )
+    app.config.from_object(config_class)
+
+    # ✅ Initialize extensions
+    db.init_app(app)
+    import instrumentation
+    instrumentation.init_app(app)  # ⏱️ per-request query count / DB time
+    import metrics
+    metrics.init_app(app)  # 📈 Prometheus /metrics
+    import images
+    images.init_app(app)  # 🖼️ srcset helpers for uploaded images
+    import assets
+    assets.init_app(app)  # 📦 fingerprinted static files, `flask assets-build`
+    import api
+    api.init_app(app)  # 📱 read-only JSON catalog at /api/v1
+    mail.init_app(app)
+    login_manager.init_app(app)
+    if migrations is None:
+        migrations = os.environ.get("FLASK_RUN_FROM_CLI") == "true"  # set by the `flask` command
+    if migrations:
+        from flask_migrate import Migrate
+        Migrate(app, db)  # 🗃️ `flask db ...`
+
+    # 📨 `flask mail-worker` drains the outbound email queue
+    from mailer import mail_worker_command
+    app.cli.add_command(mail_worker_command)
+    # 🔎 `flask search-reindex` rebuilds the SQLite FTS5 index after bulk loads
+    from search import search_reindex_command
+    app.cli.add_command(search_reindex_command)
+    # 📦 `flask release-reservations` returns stock held by abandoned checkouts
+    from inventory import release_reservations_command
+    app.cli.add_command(release_reservations_command)
+    # 📥 `flask stripe-worker` applies stored webhook events the web workers didn't
+    from payments import stripe_worker_command
+    app.cli.add_command(stripe_worker_command)
+
+    # ✅ Pages, grouped by area
+    import accounts
+    import admin
+    import orders
+    import storefront
+    app.register_blueprint(storefront.bp)
+    app.register_blueprint(accounts.bp)
+    app.register_blueprint(orders.bp)
+    app.register_blueprint(admin.bp)
+
+    return app
 
-# ✅ Import routes after app setup
-with app.app_context():
-    print(">>> Loading routes.py ...") # Add this
-    import routes
-    print(">>> Routes successfully imported!") # Addd this
 
 if __name__ == "__main__":
-    app.run(debug=True, port=5001)
+    create_app().run(debug=True, port=5001)
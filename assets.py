@@ -0,0 +1,169 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+
+import brotli
+import click
+from flask import current_app, request, send_from_directory, url_for
+
+# 📦 Third-party assets we self-host; the CDN URL is also the fallback used
+# by static_url() until `flask assets-build` has run
+VENDOR_ASSETS = {
+    "vendor/bootstrap.min.css": "https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css",
+    "vendor/chart.umd.js": "https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.js",
+}
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".svg", ".ico", ".json", ".txt", ".map"}
+SKIP_DIRS = {"dist", "uploads"}  # build output, and user uploads (already content-named)
+ASSET_MAX_AGE = 365 * 24 * 3600
+
+_manifest = None
+
+
+def _static_dir(*parts):
+    return os.path.join(current_app.static_folder, *parts)
+
+
+def _dist_dir():
+    return _static_dir("dist")
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _download_vendor_assets():
+    import requests  # build-time only; keeps it out of web worker start-up
+
+    for logical, cdn_url in VENDOR_ASSETS.items():
+        path = _static_dir(logical)
+        if os.path.exists(path):
+            continue
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            response = requests.get(cdn_url, timeout=30)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            click.echo(f"⚠️ Could not download {cdn_url} ({e}); pages keep using the CDN")
+            continue
+        _write_atomic(path, response.content)
+        click.echo(f"⬇️ {logical}")
+
+
+def _source_files():
+    root = current_app.static_folder
+    for dirpath, dirnames, filenames in os.walk(root):
+        if dirpath == root:
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for filename in filenames:
+            if filename.startswith(".") or filename.endswith(".tmp"):
+                continue
+            yield os.path.relpath(os.path.join(dirpath, filename), root).replace(os.sep, "/")
+
+
+def build_assets(download=True):
+    """Copy every static file to dist/ under a content-hashed name.
+
+    Compressible files also get ``.br``/``.gz`` siblings, written only when
+    they are smaller. Returns the manifest (logical path -> hashed path).
+    Files from earlier builds are kept so pages rendered by the previous
+    release still resolve during a rolling deploy.
+    """
+    if download:
+        _download_vendor_assets()
+
+    manifest = {}
+    for logical in sorted(_source_files()):
+        with open(_static_dir(logical), "rb") as f:
+            data = f.read()
+        # Strip source map references; we don't ship the .map files
+        if logical.startswith("vendor/"):
+            data = b"\n".join(
+                line for line in data.split(b"\n") if b"sourceMappingURL=" not in line
+            )
+
+        stem, ext = os.path.splitext(logical)
+        hashed = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+        target = os.path.join(_dist_dir(), hashed)
+        manifest[logical] = hashed
+        if os.path.exists(target):
+            continue
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if ext.lower() in COMPRESSIBLE_EXTENSIONS:
+            for suffix, compressed in (
+                (".br", brotli.compress(data, quality=11)),
+                (".gz", gzip.compress(data, compresslevel=9, mtime=0)),
+            ):
+                if len(compressed) < len(data):
+                    _write_atomic(target + suffix, compressed)
+        # Written last: a hashed file on disk means its siblings are complete
+        _write_atomic(target, data)
+
+    os.makedirs(_dist_dir(), exist_ok=True)
+    _write_atomic(
+        os.path.join(_dist_dir(), "manifest.json"),
+        json.dumps(manifest, indent=2, sort_keys=True).encode(),
+    )
+    return manifest
+
+
+def _load_manifest():
+    global _manifest
+    if _manifest is None or current_app.debug:
+        try:
+            with open(os.path.join(_dist_dir(), "manifest.json")) as f:
+                _manifest = json.load(f)
+        except FileNotFoundError:
+            _manifest = {}
+    return _manifest
+
+
+def static_url(filename):
+    """URL for a static file: fingerprinted if built, else the CDN or /static."""
+    hashed = _load_manifest().get(filename)
+    if hashed:
+        return url_for("assets", filename=hashed)
+    if filename in VENDOR_ASSETS:
+        return VENDOR_ASSETS[filename]
+    return url_for("static", filename=filename)
+
+
+def serve_asset(filename):
+    # 🗜️ Serve the precompressed sibling the client accepts; the name is
+    # content-hashed, so it can be cached forever without revalidation
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    encoding = None
+    for candidate, suffix in (("br", ".br"), ("gzip", ".gz")):
+        if request.accept_encodings[candidate] and os.path.exists(
+            os.path.join(_dist_dir(), filename + suffix)
+        ):
+            encoding = candidate
+            filename += suffix
+            break
+
+    response = send_from_directory(_dist_dir(), filename, mimetype=mimetype, max_age=ASSET_MAX_AGE)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+@click.command("assets-build")
+@click.option("--no-download", is_flag=True, help="Only fingerprint what is already in static/.")
+def assets_build_command(no_download):
+    """Fingerprint and precompress static/ into static/dist/."""
+    manifest = build_assets(download=not no_download)
+    click.echo(f"✅ Built {len(manifest)} assets into {_dist_dir()}")
+
+
+def init_app(app):
+    app.add_url_rule("/assets/<path:filename>", "assets", serve_asset)
+    app.add_template_global(static_url)
+    app.cli.add_command(assets_build_command)
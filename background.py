@@ -0,0 +1,56 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _executor_class():
+    # Under gevent, threading is monkey-patched into greenlets; CPU-heavy work
+    # like WeasyPrint would then stall the hub, so use gevent's real OS threads
+    try:
+        from gevent import monkey
+    except ImportError:
+        return ThreadPoolExecutor
+    if monkey.is_module_patched("threading"):
+        from gevent.threadpool import ThreadPoolExecutor as GeventThreadPoolExecutor
+
+        return GeventThreadPoolExecutor
+    return ThreadPoolExecutor
+
+
+def _get_executor(app):
+    # Created lazily so every gunicorn worker gets its own threads after fork
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = _executor_class()(
+                    max_workers=app.config["BACKGROUND_WORKERS"],
+                    thread_name_prefix="shop-bg",
+                )
+    return _executor
+
+
+def submit(fn, *args, **kwargs):
+    """Run ``fn`` on the background pool inside an app context.
+
+    Returns a ``Future`` whose result is ``None`` if ``fn`` raised; the
+    error is logged rather than lost.
+    """
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                logger.exception("Background task %s failed", fn.__name__)
+                return None
+
+    return _get_executor(app).submit(run)
@@ -0,0 +1,99 @@
+"""Throughput of the /api/v1 catalog endpoints.
+
+Seeds a throwaway SQLite database and drives the endpoints in-process
+(one thread = roughly one sync gunicorn worker) for a few seconds each,
+next to an ORM-object serializer for comparison:
+
+    python benchmarks/bench_api.py --products 10000 --seconds 5
+
+The target is 10,000 requests/minute (~167/s) across the deployment.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_api.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from flask import jsonify  # noqa: E402
+from app import create_app  # noqa: E402
+from conditional import conditional, page_etag  # noqa: E402
+from models import db, CatalogVersion, Product  # noqa: E402
+from pagination import keyset_paginate  # noqa: E402
+
+app = create_app()
+
+TARGET_PER_SECOND = 10_000 / 60
+
+
+@app.route("/_bench/orm_products")
+def orm_products():
+    # Same validators, but load Product objects and pick attributes off them
+    version, latest = CatalogVersion.validators()
+
+    def render():
+        page = keyset_paginate(db.select(Product), Product.id, per_page=app.config["PRODUCTS_PER_PAGE"])
+        return jsonify(data=[
+            {c.name: getattr(p, c.name) for c in Product.__table__.columns} for p in page.items
+        ])
+
+    return conditional(page_etag("bench:orm", version, latest), None, render)
+
+
+def seed(count):
+    db.create_all()
+    CatalogVersion.bump()
+    db.session.execute(db.delete(Product))
+    db.session.execute(
+        db.insert(Product),
+        [
+            {"name": f"Product {i}", "price": 9.99, "description": f"Bench item {i} " * 5, "stock": 10}
+            for i in range(count)
+        ],
+    )
+    db.session.commit()
+
+
+def throughput(client, path, seconds, headers=None):
+    assert client.get(path, headers=headers).status_code in (200, 304), path
+    done, deadline = 0, time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        client.get(path, headers=headers)
+        done += 1
+    return done / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    client = app.test_client()
+    with app.app_context():
+        seed(args.products)
+        mid = args.products // 2
+        etag = client.get("/api/v1/products").headers["ETag"]
+        cases = [
+            ("list, ORM objects", "/_bench/orm_products", None),
+            ("list, all fields", "/api/v1/products", None),
+            ("list, fields=id,name,price", "/api/v1/products?fields=id,name,price", None),
+            ("list, deep cursor", f"/api/v1/products?after={mid}", None),
+            ("list, 304 revalidation", "/api/v1/products", {"If-None-Match": etag}),
+            ("detail", f"/api/v1/products/{mid}", None),
+        ]
+        print(f"{args.products} products, target {TARGET_PER_SECOND:.0f} req/s")
+        print(f"{'endpoint':<28} {'req/s':>8} {'req/min':>9} {'x target':>9}")
+        for name, path, headers in cases:
+            rate = throughput(client, path, args.seconds, headers)
+            print(f"{name:<28} {rate:>8.0f} {rate * 60:>9.0f} {rate / TARGET_PER_SECOND:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
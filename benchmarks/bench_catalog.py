@@ -0,0 +1,71 @@
+"""Compare the old full-scan storefront with keyset pagination.
+
+Seeds a throwaway SQLite database and times ``GET /`` both ways:
+
+    python benchmarks/bench_catalog.py --products 100 500000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_catalog.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from flask import render_template  # noqa: E402
+from app import create_app  # noqa: E402
+from models import db, Product  # noqa: E402
+
+app = create_app()
+
+
+def seed(count):
+    db.session.execute(db.delete(Product))
+    db.session.execute(
+        db.insert(Product),
+        [
+            {"name": f"Product {i}", "price": 9.99, "description": f"Bench item {i}", "stock": 10}
+            for i in range(count)
+        ],
+    )
+    db.session.commit()
+
+
+def full_scan():
+    # What index() used to do on every hit
+    with app.test_request_context("/"):
+        render_template("index.html", products=Product.query.all(), page=None)
+
+
+def time_it(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+        print(f"{'products':>10} {'full scan ms':>14} {'page 1 ms':>10} {'deep page ms':>13}")
+        for count in args.products:
+            seed(count)
+            deep_cursor = db.session.execute(db.select(db.func.max(Product.id))).scalar() - 100
+            scan = time_it(full_scan, max(1, args.repeat // 10))
+            first = time_it(lambda: client.get("/"), args.repeat)
+            deep = time_it(lambda: client.get(f"/?after={deep_cursor}"), args.repeat)
+            print(f"{count:>10} {scan:>14.1f} {first:>10.1f} {deep:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
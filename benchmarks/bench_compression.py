@@ -0,0 +1,95 @@
+"""CPU cost vs. bytes saved for the response compression middleware.
+
+Seeds a throwaway SQLite database, renders real pages through the app
+(the admin orders table at several sizes, the catalog, /metrics), then
+compresses each body at a few gzip levels / Brotli qualities:
+
+    python benchmarks/bench_compression.py --orders 50 500 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_compression.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+from app import create_app  # noqa: E402
+from compression import compress  # noqa: E402
+from models import db, User, Product, Order  # noqa: E402
+
+app = create_app()
+
+SETTINGS = [("gzip", 1), ("gzip", 6), ("gzip", 9), ("br", 1), ("br", 4), ("br", 6), ("br", 11)]
+
+
+def seed(orders):
+    db.session.execute(db.delete(Order))
+    if not db.session.get(User, 1):
+        db.session.add(User(id=1, username="admin", email="admin@example.com",
+                            password=generate_password_hash("secret"), is_admin=True))
+        db.session.execute(
+            db.insert(Product),
+            [{"name": f"Product {i}", "price": 9.99, "description": f"Bench item {i}", "stock": 10}
+             for i in range(100)],
+        )
+    db.session.execute(
+        db.insert(Order),
+        [{"user_id": 1, "total": 19.98 + i, "is_paid": i % 3 != 0, "shipping_status": "Processing"}
+         for i in range(orders)],
+    )
+    db.session.commit()
+
+
+def fetch(client, path):
+    # The test client goes through app.wsgi_app, so ask for identity to get the raw body
+    response = client.get(path, headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200, (path, response.status_code)
+    return response.data
+
+
+def measure(body, encoding, level, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        compressed = compress(body, encoding, gzip_level=level, brotli_quality=level)
+    return (time.process_time() - start) / repeat * 1000, len(compressed)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = "1"
+
+    with app.app_context():
+        db.create_all()
+        pages = []
+        for count in args.orders:
+            seed(count)
+            pages.append((f"admin orders x{count}", fetch(client, "/admin/orders")))
+        pages.append(("catalog", fetch(client, "/")))
+        pages.append(("/metrics", fetch(client, "/metrics")))
+
+    print(f"{'page':<20} {'raw KB':>8} {'encoding':>9} {'cpu ms':>8} {'out KB':>8} {'saved':>7} {'KB saved/cpu ms':>16}")
+    for name, body in pages:
+        for encoding, level in SETTINGS:
+            cpu_ms, size = measure(body, encoding, level, args.repeat)
+            saved = len(body) - size
+            print(
+                f"{name:<20} {len(body) / 1024:>8.1f} {f'{encoding}-{level}':>9} {cpu_ms:>8.2f} "
+                f"{size / 1024:>8.1f} {saved / len(body):>6.0%} {saved / 1024 / max(cpu_ms, 1e-3):>16.0f}"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Query plans and timings for the hot order lookups, without and with indexes.
+
+Seeds a throwaway SQLite database (or the database in --database-url),
+runs each lookup with the model indexes dropped, then again after
+creating them:
+
+    python benchmarks/bench_indexes.py --orders 200000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--orders", type=int, default=200_000)
+parser.add_argument("--users", type=int, default=2_000)
+parser.add_argument("--repeat", type=int, default=20)
+parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+args = parser.parse_args()
+
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_indexes.db')}"
+
+from sqlalchemy import text  # noqa: E402
+from app import create_app  # noqa: E402
+from models import db, User, Order, OrderItem  # noqa: E402
+
+app = create_app()
+
+STAGES = ["Processing", "Shipped", "In Transit", "Delivered"]
+
+QUERIES = {
+    "orders() / dashboard()": (
+        'SELECT * FROM "order" WHERE user_id = :user_id ORDER BY date DESC',
+        {"user_id": 42},
+    ),
+    "admin_orders() first page": (
+        'SELECT * FROM "order" ORDER BY date DESC LIMIT 50',
+        {},
+    ),
+    "stripe_webhook() newest unpaid": (
+        'SELECT * FROM "order" WHERE is_paid = :paid ORDER BY id DESC LIMIT 1',
+        {"paid": False},
+    ),
+    "delivered count": (
+        'SELECT COUNT(*) FROM "order" WHERE shipping_status = :status',
+        {"status": "Delivered"},
+    ),
+    "order_items for an order": (
+        "SELECT * FROM order_item WHERE order_id = :order_id",
+        {"order_id": 1234},
+    ),
+    "order_items for a product": (
+        "SELECT COUNT(*) FROM order_item WHERE product_id = :product_id",
+        {"product_id": 7},
+    ),
+}
+
+INDEXES = [idx for table in (Order.__table__, OrderItem.__table__) for idx in table.indexes]
+
+
+def seed():
+    db.drop_all()
+    db.create_all()
+    rng = random.Random(0)
+    db.session.execute(
+        db.insert(User),
+        [{"username": f"user{i}", "email": f"user{i}@example.com", "password": "x"} for i in range(args.users)],
+    )
+    start = datetime(2024, 1, 1)
+    db.session.execute(
+        db.insert(Order),
+        [
+            {
+                "user_id": rng.randint(1, args.users),
+                "date": start + timedelta(minutes=i),
+                "total": 10.0,
+                "is_paid": rng.random() > 0.01,
+                "shipping_status": rng.choice(STAGES),
+            }
+            for i in range(args.orders)
+        ],
+    )
+    db.session.execute(
+        db.insert(OrderItem),
+        [
+            {"order_id": i // 3 + 1, "product_id": rng.randint(1, 500), "product_name": "x", "quantity": 1, "price": 10.0}
+            for i in range(args.orders * 3)
+        ],
+    )
+    db.session.commit()
+
+
+def explain(sql, params):
+    if db.engine.dialect.name == "sqlite":
+        rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).all()
+        return "; ".join(row[-1] for row in rows)
+    rows = db.session.execute(text(f"EXPLAIN {sql}"), params).all()
+    return " / ".join(row[0].strip() for row in rows[:3])
+
+
+def run(label):
+    print(f"\n=== {label}")
+    for name, (sql, params) in QUERIES.items():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            db.session.execute(text(sql), params).all()
+        elapsed = (time.perf_counter() - start) / args.repeat * 1000
+        print(f"{name:<32} {elapsed:>9.2f} ms   {explain(sql, params)}")
+
+
+def main():
+    with app.app_context():
+        print(f"Seeding {args.orders} orders / {args.orders * 3} order items ...")
+        seed()
+        for idx in INDEXES:
+            idx.drop(db.engine)
+        run("without indexes")
+        for idx in INDEXES:
+            idx.create(db.engine)
+        db.session.execute(text("ANALYZE"))
+        run("with indexes")
+
+
+if __name__ == "__main__":
+    main()
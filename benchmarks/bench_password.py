@@ -0,0 +1,58 @@
+"""Logins per second per core for each PASSWORD_HASH_METHOD candidate.
+
+A login costs one password verify (twice that, once, when the stored hash
+is upgraded), and with sync gunicorn workers that verify holds a worker.
+For each method this times verifies in one process for --seconds, then
+the same on every core at once (memory-hard scrypt can scale worse than
+the core count suggests):
+
+    python benchmarks/bench_password.py --seconds 3
+    python benchmarks/bench_password.py --methods scrypt:16384:8:1 pbkdf2:sha256:600000
+
+Pick the costliest method whose logins/s across the deployment still
+covers the peak login rate; set it as PASSWORD_HASH_METHOD.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+METHODS = (
+    "scrypt:32768:8:1",  # Werkzeug's default
+    "scrypt:16384:8:1",
+    "pbkdf2:sha256:1000000",  # Werkzeug's pbkdf2 default
+    "pbkdf2:sha256:600000",
+    "pbkdf2:sha256:210000",
+)
+PASSWORD = "correct horse battery staple"
+
+
+def verifies_per_second(method, seconds):
+    stored = generate_password_hash(PASSWORD, method=method)
+    done = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < seconds:
+        check_password_hash(stored, PASSWORD)
+        done += 1
+    return done / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--methods", nargs="+", default=METHODS)
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--cores", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    print(f"{'method':<24} {'ms/login':>9} {'logins/s/core':>14} {f'logins/s on {args.cores} cores':>22}")
+    with ProcessPoolExecutor(args.cores) as pool:
+        for method in args.methods:
+            single = verifies_per_second(method, args.seconds)
+            parallel = sum(pool.map(verifies_per_second, [method] * args.cores, [args.seconds] * args.cores))
+            print(f"{method:<24} {1000 / single:>9.1f} {single:>14.1f} {parallel:>22.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Full-text search vs. a naive LIKE '%term%' scan.
+
+Seeds a throwaway SQLite database (running the migrations so product_fts
+exists) with Zipf-distributed words, then times one page of results for
+a few queries:
+
+    python benchmarks/bench_search.py --products 100000
+
+"LIKE page" is an unranked LIMIT that can stop early once it finds a page
+of hits; "LIKE all" is what any ranking or result count costs with LIKE,
+a scan of every row. FTS always ranks all of its matches, so a term that
+is in most products is its worst case.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_search.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from flask_migrate import upgrade  # noqa: E402
+from app import create_app  # noqa: E402
+from models import db, Product  # noqa: E402
+from search import rebuild_index, search_products  # noqa: E402
+
+app = create_app(migrations=True)
+
+SYLLABLES = "ka lo mi ne ru sa ti vo ze bri cla dro fen gor hal jun kel mar nor pel".split()
+
+
+def vocabulary(rng, size=5000):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(words)
+
+
+def seed(count):
+    # Zipf-like word frequencies, so some terms are common and most are rare
+    rng = random.Random(42)
+    words = vocabulary(rng)
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    db.session.execute(db.delete(Product))
+    for start in range(0, count, 10_000):
+        db.session.execute(
+            db.insert(Product),
+            [
+                {
+                    "name": " ".join(rng.choices(words, weights, k=3)).title(),
+                    "price": 9.99,
+                    "description": " ".join(rng.choices(words, weights, k=20)),
+                    "stock": 10,
+                }
+                for _ in range(start, min(start + 10_000, count))
+            ],
+        )
+    db.session.commit()
+    rebuild_index()
+    # A very common term, a mid-frequency one, a rare one, a prefix, two terms, and a miss
+    return [words[0], words[50], words[3000], words[50][:3], f"{words[1]} {words[20]}", "qqqq"]
+
+
+def like_filter(stmt, query):
+    # What a search box without an index does
+    for term in query.split():
+        pattern = f"%{term}%"
+        stmt = stmt.where(db.or_(Product.name.like(pattern), Product.description.like(pattern)))
+    return stmt
+
+
+def like_page(query, per_page):
+    return db.session.execute(like_filter(db.select(Product), query).limit(per_page)).scalars().all()
+
+
+def like_all(query):
+    return db.session.execute(like_filter(db.select(db.func.count(Product.id)), query)).scalar()
+
+
+def time_it(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    per_page = app.config["PRODUCTS_PER_PAGE"]
+
+    with app.app_context():
+        upgrade(directory=os.path.join(BASE_DIR, "migrations"))
+        queries = seed(args.products)
+        print(f"{args.products} products, {per_page} results per page")
+        print(f"{'query':<22} {'matches':>8} {'LIKE page ms':>13} {'LIKE all ms':>12} {'FTS ms':>8}")
+        for query in queries:
+            page = time_it(lambda: like_page(query, per_page), args.repeat)
+            scan = time_it(lambda: like_all(query), args.repeat)
+            fts = time_it(lambda: search_products(query, per_page=per_page), args.repeat)
+            print(f"{query:<22} {like_all(query):>8} {page:>13.2f} {scan:>12.2f} {fts:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
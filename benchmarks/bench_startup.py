@@ -0,0 +1,145 @@
+"""Cold start: import cost, time to first response, and worker respawn.
+
+    python benchmarks/bench_startup.py
+
+1. ``python -X importtime -c "import wsgi"``: total, and the slowest
+   modules imported by wsgi.py and app.py.
+2. In a fresh interpreter: create_app() and the first requests through the
+   test client, plus whether the heavy SDKs (WeasyPrint, Stripe) got loaded.
+3. gunicorn with and without preload_app: seconds from launch to the first
+   /ping, and from killing the worker to its replacement answering.
+"""
+import argparse
+import os
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PORT = 8124
+LAZY_MODULES = ("weasyprint", "stripe")
+
+FIRST_REQUEST = """
+import sys, time
+start = time.perf_counter()
+from wsgi import app
+created = time.perf_counter()
+client = app.test_client()
+client.get("/ping")
+pinged = time.perf_counter()
+client.get("/")
+rendered = time.perf_counter()
+print(created - start, pinged - created, rendered - pinged,
+      *[int(name in sys.modules) for name in {modules!r}])
+"""
+
+
+def env():
+    return dict(
+        os.environ,
+        DATABASE_URL=os.environ.get("DATABASE_URL") or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_startup.db')}",
+        PROMETHEUS_MULTIPROC_DIR=tempfile.mkdtemp(),
+    )
+
+
+def import_times(run_env):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import wsgi"],
+        cwd=BASE_DIR, env=run_env, capture_output=True, text=True,
+    )
+    # "import time: self [us] | cumulative | name", indented two spaces per level
+    modules = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)$", line)
+        if match:
+            modules.append((int(match.group(1)), len(match.group(2)) // 2, match.group(3)))
+    total = next(cumulative for cumulative, depth, name in modules if name == "wsgi")
+    # What wsgi.py and app.py pull in directly (app's own imports sit one level deeper)
+    direct = sorted((m for m in modules if m[1] in (1, 2) and m[2] != "app"), reverse=True)
+    return total, direct
+
+
+def first_request(run_env):
+    subprocess.run(
+        [sys.executable, "-c", "from wsgi import app\nfrom models import db\nwith app.app_context(): db.create_all()"],
+        cwd=BASE_DIR, env=run_env, capture_output=True, check=True,
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_REQUEST.format(modules=LAZY_MODULES)],
+        cwd=BASE_DIR, env=run_env, capture_output=True, text=True, check=True,
+    )
+    return result.stdout.split()[-(3 + len(LAZY_MODULES)):]
+
+
+def wait_for_ping(timeout=60):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{PORT}/ping", timeout=1).status_code == 200:
+                return True
+        except requests.RequestException:
+            time.sleep(0.01)
+    return False
+
+
+def gunicorn_start(run_env, preload, workers):
+    run_env = dict(run_env, GUNICORN_PRELOAD=str(preload), GUNICORN_WORKER_CLASS="sync")
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        ["gunicorn", "wsgi:app", "-w", str(workers), "-b", f"127.0.0.1:{PORT}"],
+        cwd=BASE_DIR, env=run_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not wait_for_ping():
+            return float("nan"), float("nan")
+        first = time.perf_counter() - start
+
+        # Respawn: kill every worker, time until a replacement answers
+        children = subprocess.run(
+            ["pgrep", "-P", str(server.pid)], capture_output=True, text=True
+        ).stdout.split()
+        start = time.perf_counter()
+        for pid in children:
+            os.kill(int(pid), signal.SIGKILL)
+        time.sleep(0.05)  # let the old socket owner go before polling
+        respawn = time.perf_counter() - start if wait_for_ping() else float("nan")
+        return first, respawn
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--top", type=int, default=12)
+    args = parser.parse_args()
+    run_env = env()
+
+    total, direct = import_times(run_env)
+    print(f"import wsgi: {total / 1000:.0f} ms; slowest imports made by wsgi.py/app.py:")
+    for cumulative, _, name in direct[: args.top]:
+        print(f"  {cumulative / 1000:>7.1f} ms  {name}")
+
+    created, pinged, rendered, *loaded = first_request(run_env)
+    print(
+        f"\nimport + create_app {float(created) * 1000:.0f} ms, first /ping {float(pinged) * 1000:.0f} ms, "
+        f"first / {float(rendered) * 1000:.0f} ms"
+    )
+    for name, flag in zip(LAZY_MODULES, loaded):
+        print(f"  {name} loaded after first requests: {'yes' if flag == '1' else 'no'}")
+
+    print(f"\ngunicorn, {args.workers} sync workers")
+    print(f"{'preload_app':<12} {'first response s':>17} {'respawn s':>10}")
+    for preload in (False, True):
+        first, respawn = gunicorn_start(run_env, preload, args.workers)
+        print(f"{str(preload):<12} {first:>17.2f} {respawn:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
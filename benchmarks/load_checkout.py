@@ -0,0 +1,160 @@
+"""Concurrent checkout load test against a slow local Stripe stub.
+
+Starts a stub of the Stripe Checkout API that sleeps --stripe-latency
+seconds per call, runs the app under gunicorn with each worker class,
+and drives --concurrency logged-in clients through /checkout:
+
+    python benchmarks/load_checkout.py --concurrency 64 --stripe-latency 0.5
+
+Pass --database-url to run against PostgreSQL instead of a SQLite file.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+
+import requests
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--concurrency", type=int, default=64)
+parser.add_argument("--duration", type=float, default=15, help="seconds per worker class")
+parser.add_argument("--stripe-latency", type=float, default=0.5)
+parser.add_argument("--workers", type=int, default=2, help="gunicorn processes")
+parser.add_argument("--worker-classes", nargs="+", default=["sync", "gthread", "gevent"])
+parser.add_argument("--threads", type=int, default=16, help="threads per gthread worker")
+parser.add_argument("--database-url")
+args = parser.parse_args()
+
+DATABASE_URL = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'load_checkout.db')}"
+os.environ["DATABASE_URL"] = DATABASE_URL
+
+APP_PORT = 8123
+STUB_PORT = 12111
+_session_ids = count(1)
+
+
+class StripeStub(BaseHTTPRequestHandler):
+    """Just enough of POST /v1/checkout/sessions for checkout()."""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(args.stripe_latency)
+        session_id = f"cs_test_{next(_session_ids)}"
+        body = json.dumps({
+            "id": session_id,
+            "object": "checkout.session",
+            "url": f"https://checkout.stripe.test/pay/{session_id}",
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *a):
+        pass
+
+
+def seed():
+    from werkzeug.security import generate_password_hash
+    from app import create_app
+    from models import db, User, Product
+
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        password = generate_password_hash("secret")
+        db.session.execute(
+            db.insert(User),
+            [{"username": f"buyer{i}", "email": f"buyer{i}@example.com", "password": password} for i in range(args.concurrency)],
+        )
+        db.session.add(Product(name="Load Test Widget", price=9.99, description="", stock=10**9))
+        db.session.commit()
+
+
+def client(index, deadline, results):
+    http = requests.Session()
+    base = f"http://127.0.0.1:{APP_PORT}"
+    try:
+        http.post(f"{base}/login", data={"username": f"buyer{index}", "password": "secret"}, timeout=60)
+        http.get(f"{base}/add_to_cart/1", allow_redirects=False, timeout=60)
+    except requests.RequestException:
+        results.append((False, 0.0))
+        return
+    while time.time() < deadline:
+        start = time.perf_counter()
+        try:
+            r = http.get(f"{base}/checkout", allow_redirects=False, timeout=60)
+            ok = r.status_code == 303
+        except requests.RequestException:
+            ok = False
+        results.append((ok, time.perf_counter() - start))
+
+
+def run(worker_class):
+    env = dict(
+        os.environ,
+        DATABASE_URL=DATABASE_URL,
+        STRIPE_SECRET_KEY="sk_test_load",
+        STRIPE_API_BASE=f"http://127.0.0.1:{STUB_PORT}",
+        GUNICORN_WORKER_CLASS=worker_class,
+        GUNICORN_THREADS=str(args.threads if worker_class == "gthread" else 1),
+    )
+    server = subprocess.Popen(
+        ["gunicorn", "wsgi:app", "-w", str(args.workers), "-b", f"127.0.0.1:{APP_PORT}"],
+        cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(100):
+            try:
+                requests.get(f"http://127.0.0.1:{APP_PORT}/ping", timeout=1)
+                break
+            except requests.RequestException:
+                time.sleep(0.2)
+
+        results = []
+        deadline = time.time() + args.duration
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            for i in range(args.concurrency):
+                pool.submit(client, i, deadline, results)
+    finally:
+        server.terminate()
+        server.wait()
+
+    ok = [latency for success, latency in results if success]
+    ok.sort()
+    p95 = ok[int(len(ok) * 0.95)] if ok else float("nan")
+    print(
+        f"{worker_class:<8} {len(ok) / args.duration:>10.1f} {len(results) - len(ok):>8} "
+        f"{(sum(ok) / len(ok) if ok else float('nan')) * 1000:>10.0f} {p95 * 1000:>10.0f}"
+    )
+
+
+def main():
+    seed()
+    stub = ThreadingHTTPServer(("127.0.0.1", STUB_PORT), StripeStub)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+
+    print(
+        f"{args.concurrency} concurrent checkouts, Stripe latency {args.stripe_latency}s, "
+        f"{args.workers} gunicorn workers"
+    )
+    print(f"{'workers':<8} {'checkouts/s':>10} {'errors':>8} {'avg ms':>10} {'p95 ms':>10}")
+    for worker_class in args.worker_classes:
+        run(worker_class)
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
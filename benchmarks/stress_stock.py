@@ -0,0 +1,181 @@
+"""Many buyers racing for the same product, to check stock never oversells.
+
+Seeds a product with --stock units and --buyers users who each have
+--quantity of it in their cart, then sends every buyer through /checkout
+at once from a thread pool (the app in-process, Stripe replaced by a local
+stub). Then every successful buyer reloads /checkout, which must resume
+their open session rather than create another order, and half of them
+cancel, which must return the stock exactly:
+
+    python benchmarks/stress_stock.py --buyers 200 --stock 25
+
+Pass --database-url to run against PostgreSQL; SQLite serialises writers,
+so under heavy load some checkouts there can fail with "database is locked".
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--buyers", type=int, default=200)
+parser.add_argument("--stock", type=int, default=25)
+parser.add_argument("--quantity", type=int, default=1, help="units in each buyer's cart")
+parser.add_argument("--stripe-latency", type=float, default=0.05)
+parser.add_argument("--database-url")
+args = parser.parse_args()
+
+STUB_PORT = 12112
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'stress_stock.db')}"
+os.environ["STRIPE_SECRET_KEY"] = "sk_test_stress"
+os.environ["STRIPE_API_BASE"] = f"http://127.0.0.1:{STUB_PORT}"
+os.environ["CART_BACKEND"] = "database"
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+from app import create_app  # noqa: E402
+from inventory import RESERVED  # noqa: E402
+from models import db, Order, Product, User  # noqa: E402
+
+app = create_app()
+
+_session_ids = count(1)
+logging.getLogger("instrumentation").setLevel(logging.ERROR)  # lock waits are expected here
+
+
+class StripeStub(BaseHTTPRequestHandler):
+    """Creates, retrieves and expires Checkout Sessions, which is all checkout() and its cancel need."""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path.endswith("/expire"):
+            self.reply(self.path.split("/")[-2], "expired")
+        else:
+            self.reply(f"cs_test_{next(_session_ids)}", "open")
+
+    def do_GET(self):
+        self.reply(self.path.rstrip("/").split("/")[-1], "open")
+
+    def reply(self, session_id, status):
+        time.sleep(args.stripe_latency)
+        body = json.dumps({
+            "id": session_id,
+            "object": "checkout.session",
+            "status": status,
+            "url": f"https://checkout.stripe.test/pay/{session_id}",
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *a):
+        pass
+
+
+def seed():
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        password = generate_password_hash("secret")
+        db.session.execute(
+            db.insert(User),
+            [{"username": f"buyer{i}", "email": f"buyer{i}@example.com", "password": password} for i in range(args.buyers)],
+        )
+        product = Product(name="Last Widget", price=9.99, description="", stock=args.stock)
+        db.session.add(product)
+        db.session.commit()
+        return product.id
+
+
+def logged_in_client(user_id, product_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user_id)
+    for _ in range(args.quantity):
+        client.get(f"/add_to_cart/{product_id}")
+    return client
+
+
+def stock(product_id):
+    with app.app_context():
+        return db.session.get(Product, product_id).stock
+
+
+def reserved_units():
+    with app.app_context():
+        return db.session.execute(
+            db.select(db.func.count(Order.id)).where(Order.reservation_status == RESERVED)
+        ).scalar() * args.quantity
+
+
+def main():
+    product_id = seed()
+    stub = ThreadingHTTPServer(("127.0.0.1", STUB_PORT), StripeStub)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+
+    clients = [logged_in_client(i + 1, product_id) for i in range(args.buyers)]
+    start_line = threading.Barrier(args.buyers)
+
+    def buy(client):
+        start_line.wait()
+        response = client.get("/checkout")
+        if response.status_code == 303 and "stripe.test" in response.location:
+            return "reserved"
+        return "sold out" if response.status_code == 302 else f"error {response.status_code}"
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.buyers) as pool:
+        outcomes = list(pool.map(buy, clients))
+    elapsed = time.perf_counter() - started
+
+    winners = [client for client, outcome in zip(clients, outcomes) if outcome == "reserved"]
+    print(f"{args.buyers} buyers x {args.quantity} for {args.stock} units in {elapsed:.2f}s")
+    for outcome in sorted(set(outcomes)):
+        print(f"  {outcome:<12} {outcomes.count(outcome)}")
+
+    left = stock(product_id)
+    print(f"stock left {left}, reserved {reserved_units()}")
+    assert left >= 0, "oversold"
+    assert left + reserved_units() == args.stock, "units lost or created"
+    assert len(winners) == min(args.buyers, args.stock // args.quantity) or "error" in " ".join(outcomes)
+
+    # Every winner reloads /checkout: back to the same session, no new order or stock taken
+    with app.app_context():
+        orders_before = db.session.execute(db.select(db.func.count(Order.id))).scalar()
+    with ThreadPoolExecutor(len(winners) or 1) as pool:
+        replays = list(pool.map(lambda client: client.get("/checkout").status_code, winners))
+    with app.app_context():
+        orders_after = db.session.execute(db.select(db.func.count(Order.id))).scalar()
+    print(f"{len(replays)} replays: {replays.count(303)} resumed, {orders_after - orders_before} new orders")
+    assert orders_after == orders_before and stock(product_id) == left, "replay created an order"
+
+    # Half of the winners walk away: their units go back, exactly once
+    with app.app_context():
+        orders = {o.user_id: o.id for o in Order.query.filter_by(reservation_status=RESERVED)}
+    cancelled = 0
+    for client in winners[::2]:
+        with client.session_transaction() as session:
+            user_id = int(session["_user_id"])
+        client.get(f"/checkout/cancel/{orders[user_id]}")
+        client.get(f"/checkout/cancel/{orders[user_id]}")  # a double click is a no-op
+        cancelled += 1
+    left = stock(product_id)
+    print(f"after {cancelled} cancellations: stock left {left}, reserved {reserved_units()}")
+    assert left + reserved_units() == args.stock, "cancel returned the wrong amount"
+    print("✅ no oversell")
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+from abc import ABC, abstractmethod
+
+from flask import current_app, session
+from flask_login import current_user
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Cart, CartItem, Product
+
+
+class BaseCart(ABC):
+    """Common pricing for both cart backends.
+
+    Backends only store ``{product_id: quantity}``; names and prices always
+    come from the ``product`` table, fetched with one ``IN (...)`` query.
+    """
+
+    @abstractmethod
+    def quantities(self):
+        """``{product_id: quantity}`` in the order items were added."""
+
+    @abstractmethod
+    def add(self, product):
+        """Add one unit of ``product``."""
+
+    @abstractmethod
+    def remove(self, product_id):
+        """Drop the line for ``product_id``, if any."""
+
+    @abstractmethod
+    def clear(self):
+        """Empty the cart."""
+
+    def priced(self):
+        """Return ``(items, total)`` for the current cart.
+
+        Products that no longer exist are dropped from the cart as a side
+        effect; the caller commits.
+        """
+        quantities = self.quantities()
+        if not quantities:
+            return [], 0
+
+        products = Product.query.filter(Product.id.in_(list(quantities))).all()
+        by_id = {p.id: p for p in products}
+        for missing in set(quantities) - set(by_id):
+            self.remove(missing)
+
+        items = [
+            {"id": pid, "name": by_id[pid].name, "price": by_id[pid].price, "quantity": qty}
+            for pid, qty in quantities.items()
+            if pid in by_id
+        ]
+        total = sum(item["price"] * item["quantity"] for item in items)
+        return items, total
+
+
+class SessionCart(BaseCart):
+    """The original cart: a list of line items in the signed session cookie."""
+
+    def quantities(self):
+        return {item["id"]: item["quantity"] for item in session.get("cart", [])}
+
+    def add(self, product):
+        cart = session.get("cart", [])
+        for item in cart:
+            if item["id"] == product.id:
+                item["quantity"] += 1
+                break
+        else:
+            cart.append({
+                "id": product.id,
+                "name": product.name,
+                "price": product.price,
+                "quantity": 1
+            })
+        session["cart"] = cart
+
+    def remove(self, product_id):
+        session["cart"] = [item for item in session.get("cart", []) if item["id"] != product_id]
+
+    def clear(self):
+        session.pop("cart", None)
+
+
+class DatabaseCart(BaseCart):
+    """Cart rows in ``cart``/``cart_item``, keyed by the logged-in user."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+
+    def _cart_id(self, create=False):
+        select_id = db.select(Cart.id).where(Cart.user_id == self.user_id)
+        cart_id = db.session.scalar(select_id)
+        if cart_id is None and create:
+            try:
+                with db.session.begin_nested():
+                    cart = Cart(user_id=self.user_id)
+                    db.session.add(cart)
+                cart_id = cart.id
+            except IntegrityError:
+                # A concurrent request (another tab) created the cart first
+                cart_id = db.session.scalar(select_id)
+        return cart_id
+
+    def quantities(self):
+        rows = db.session.execute(
+            db.select(CartItem.product_id, CartItem.quantity)
+            .join(Cart)
+            .where(Cart.user_id == self.user_id)
+            .order_by(CartItem.id)
+        )
+        return dict(rows.all())
+
+    def add(self, product):
+        cart_id = self._cart_id(create=True)
+        bump = (
+            db.update(CartItem)
+            .where(CartItem.cart_id == cart_id, CartItem.product_id == product.id)
+            .values(quantity=CartItem.quantity + 1)
+        )
+        if db.session.execute(bump).rowcount:
+            return
+        try:
+            with db.session.begin_nested():
+                db.session.add(CartItem(cart_id=cart_id, product_id=product.id, quantity=1))
+        except IntegrityError:
+            # A concurrent first add of the same product won the insert
+            db.session.execute(bump)
+
+    def remove(self, product_id):
+        cart_id = self._cart_id()
+        if cart_id is not None:
+            db.session.execute(
+                db.delete(CartItem).where(CartItem.cart_id == cart_id, CartItem.product_id == product_id)
+            )
+
+    def clear(self):
+        cart_id = self._cart_id()
+        if cart_id is not None:
+            db.session.execute(db.delete(CartItem).where(CartItem.cart_id == cart_id))
+
+
+def get_cart():
+    """The current user's cart, using the backend picked by ``CART_BACKEND``."""
+    if current_app.config["CART_BACKEND"] == "database":
+        return DatabaseCart(current_user.id)
+    return SessionCart()
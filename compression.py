@@ -0,0 +1,117 @@
+import gzip
+from itertools import chain
+
+import brotli
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header, parse_cache_control_header
+from werkzeug.wsgi import ClosingIterator
+
+# Already-compressed types (PDF invoices, images, fonts) are left alone
+COMPRESSIBLE_TYPES = {
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/csv",
+    "text/xml",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+    "application/xml",
+    "image/svg+xml",
+}
+SKIP_STATUSES = {204, 206, 304}
+
+
+def negotiate_encoding(accept_encoding):
+    """Pick "br" or "gzip" from an Accept-Encoding value, or None."""
+    accepted = parse_accept_header(accept_encoding)
+    br, gz = accepted["br"], accepted["gzip"]
+    if br and br >= gz:
+        return "br"
+    if gz:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding, gzip_level=6, brotli_quality=4):
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality, mode=brotli.MODE_TEXT)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    """WSGI middleware that Brotli/gzip-compresses text responses.
+
+    Bodies under ``min_size`` bytes, HEAD requests, partial responses and
+    anything already carrying a Content-Encoding (e.g. /assets) pass
+    through untouched. Compressed responses get a weak ETag, so
+    If-None-Match still matches the view's strong one.
+    """
+
+    def __init__(self, app, min_size=1024, gzip_level=6, brotli_quality=4):
+        self.app = app
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def __call__(self, environ, start_response):
+        if environ.get("REQUEST_METHOD") == "HEAD":
+            return self.app(environ, start_response)
+
+        captured = {}
+        written = []
+
+        def capture_start_response(status, headers, exc_info=None):
+            captured.update(status=status, headers=headers, exc_info=exc_info)
+            return written.append  # legacy write() callable
+
+        app_iter = self.app(environ, capture_start_response)
+        status, headers = captured["status"], Headers(captured["headers"])
+
+        def passthrough():
+            start_response(status, headers.to_wsgi_list(), captured["exc_info"])
+            if written:
+                return ClosingIterator(chain(written, app_iter), getattr(app_iter, "close", None))
+            return app_iter
+
+        if not self._compressible(status, headers):
+            return passthrough()
+
+        # Whether we compress depends on Accept-Encoding, so say so to caches
+        vary = headers.get("Vary")
+        if not vary:
+            headers["Vary"] = "Accept-Encoding"
+        elif "accept-encoding" not in vary.lower():
+            headers["Vary"] = f"{vary}, Accept-Encoding"
+
+        encoding = negotiate_encoding(environ.get("HTTP_ACCEPT_ENCODING", ""))
+        content_length = headers.get("Content-Length", type=int)
+        if encoding is None or (content_length is not None and content_length < self.min_size):
+            return passthrough()
+
+        try:
+            body = b"".join(chain(written, app_iter))
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
+
+        if len(body) >= self.min_size:
+            body = compress(body, encoding, self.gzip_level, self.brotli_quality)
+            headers["Content-Encoding"] = encoding
+            etag = headers.get("ETag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+        headers["Content-Length"] = str(len(body))
+        start_response(status, headers.to_wsgi_list(), captured["exc_info"])
+        return [body]
+
+    @staticmethod
+    def _compressible(status, headers):
+        if int(status.split(" ", 1)[0]) in SKIP_STATUSES:
+            return False
+        if "Content-Encoding" in headers or "Content-Range" in headers:
+            return False
+        if parse_cache_control_header(headers.get("Cache-Control")).no_transform:
+            return False
+        mimetype = headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+        return mimetype in COMPRESSIBLE_TYPES
@@ -0,0 +1,61 @@
+import hashlib
+import json
+import os
+
+from flask import current_app, make_response, request, session
+from flask_login import current_user
+from werkzeug.http import is_resource_modified
+from werkzeug.wrappers import Response
+
+_release_digest = None
+
+
+def release_digest():
+    # A deploy that changes templates or fingerprinted assets changes every page
+    global _release_digest
+    if _release_digest is None:
+        env = current_app.jinja_env
+        digest = hashlib.sha256()
+        for name in sorted(env.list_templates()):
+            digest.update(name.encode())
+            digest.update(env.loader.get_source(env, name)[0].encode())
+        manifest = os.path.join(current_app.static_folder, "dist", "manifest.json")
+        if os.path.exists(manifest):
+            with open(manifest, "rb") as f:
+                digest.update(f.read())
+        _release_digest = digest.hexdigest()
+    return _release_digest
+
+
+def page_etag(*parts):
+    """Hash cheap validator inputs (row counts, max(updated_at), cursor) into an ETag.
+
+    The viewer is always part of it: the nav and buttons differ for guests,
+    customers and admins.
+    """
+    viewer = (current_user.get_id(), getattr(current_user, "is_admin", False))
+    return hashlib.sha256(
+        json.dumps([release_digest(), viewer, *parts], default=str).encode()
+    ).hexdigest()[:32]
+
+
+def conditional(etag, last_modified, render):
+    """Answer a conditional GET with 304, calling ``render`` only when needed.
+
+    ``render`` returns the full response (a rendered template, send_file,
+    ...). Pages with pending flash messages are always rendered so the
+    message isn't lost. Responses are ``private, no-cache``: browsers keep
+    them but revalidate on every view, which is what makes the 304 work.
+    """
+    fresh = (
+        request.method in ("GET", "HEAD")
+        and not session.get("_flashes")
+        and not is_resource_modified(request.environ, etag=etag, last_modified=last_modified)
+    )
+    response = Response(status=304) if fresh else make_response(render())
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
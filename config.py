@@ -1,5 +1,6 @@
 import os
 from dotenv import load_dotenv
+from pooling import engine_options
 
 load_dotenv()
 
@@ -21,13 +22,30 @@ class Config:
 
     SQLALCHEMY_DATABASE_URI = db_url
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Pool sized for the gunicorn worker model (DB_POOL_* env vars override), see pooling.py
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(db_url)
 
     SECRET_KEY = os.getenv("SECRET_KEY", "dev_secret_key")
 
+    # Werkzeug hash method and cost, e.g. "scrypt:16384:8:1" or "pbkdf2:sha256:600000".
+    # Stored hashes made with other settings are upgraded on the next login, see passwords.py
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+
+    # Statements slower than this are logged with their endpoint
+    SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+
     # Stripe
     STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
     STRIPE_PUBLIC_KEY = os.getenv("STRIPE_PUBLIC_KEY")
     STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
+    STRIPE_TIMEOUT = float(os.getenv("STRIPE_TIMEOUT", 10))
+    STRIPE_MAX_NETWORK_RETRIES = int(os.getenv("STRIPE_MAX_NETWORK_RETRIES", 1))
+    STRIPE_API_BASE = os.getenv("STRIPE_API_BASE")
+    # Stock is held from checkout until payment; the Stripe session (and the hold) expires after this
+    CHECKOUT_RESERVATION_MINUTES = int(os.getenv("CHECKOUT_RESERVATION_MINUTES", 30))
+    # Stored webhook events that fail to apply are retried with exponential backoff
+    STRIPE_EVENT_MAX_ATTEMPTS = int(os.getenv("STRIPE_EVENT_MAX_ATTEMPTS", 8))
+    STRIPE_EVENT_RETRY_BASE_SECONDS = int(os.getenv("STRIPE_EVENT_RETRY_BASE_SECONDS", 15))
 
     # Email
     MAIL_SERVER = os.getenv("MAIL_SERVER")
@@ -36,11 +54,46 @@ class Config:
     MAIL_USERNAME = os.getenv("MAIL_USERNAME")
     MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
     MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER")
+    MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", 6))
+    MAIL_RETRY_BASE_SECONDS = int(os.getenv("MAIL_RETRY_BASE_SECONDS", 30))
+    MAIL_TIMEOUT = float(os.getenv("MAIL_TIMEOUT", 30))
+    # A claimed batch is due again after this if its worker died mid-send
+    MAIL_LEASE_SECONDS = int(os.getenv("MAIL_LEASE_SECONDS", 600))
+    # Used for absolute links (e.g. invoice assets) when the mail worker renders outside a request
+    SHOP_BASE_URL = os.getenv("SHOP_BASE_URL", "http://localhost:5001")
+
+    # Storefront
+    PRODUCTS_PER_PAGE = int(os.getenv("PRODUCTS_PER_PAGE", 24))
+    # "database" keeps carts in the cart/cart_item tables; "session" is the old cookie cart
+    CART_BACKEND = os.getenv("CART_BACKEND", "database")
+
+    # Search results page by offset; cap how deep a crawler can push that
+    SEARCH_MAX_PAGES = int(os.getenv("SEARCH_MAX_PAGES", 20))
 
-    # File uploads
+    # Storefront fragment cache: "memory" (per-worker LRU), "file" (shared dir) or "none"
+    FRAGMENT_CACHE_BACKEND = os.getenv("FRAGMENT_CACHE_BACKEND", "memory")
+    FRAGMENT_CACHE_TTL = int(os.getenv("FRAGMENT_CACHE_TTL", 300))  # seconds
+    FRAGMENT_CACHE_SIZE = int(os.getenv("FRAGMENT_CACHE_SIZE", 256))  # entries, per worker (memory) or in total (file)
+    FRAGMENT_CACHE_DIR = os.getenv("FRAGMENT_CACHE_DIR", "instance/fragments")
+
+    # Logged-in user principal cache (user_cache.py); per worker, 0 disables
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 60))  # seconds
+    USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))  # users
+
+    # Invoices (rendered PDFs are cached on disk, keyed by order + content hash)
+    INVOICE_CACHE_DIR = os.getenv("INVOICE_CACHE_DIR", "instance/invoices")
+    BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", 2))
+
+    # File uploads (images.py stores resized WebP/JPEG variants, named by content hash)
     UPLOAD_FOLDER = "static/uploads/avatars"
+    PRODUCT_UPLOAD_FOLDER = "static/uploads/products"
     ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif"}
 
+    # Response compression (compression.py, wired up in wsgi.py)
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))  # bytes
+    COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))  # 1-9
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))  # 0-11
+
 # Security — HTTPS-only cookies
 SESSION_COOKIE_SECURE = True          # Only send cookies over HTTPS
 REMEMBER_COOKIE_SECURE = True         # Flask-Login "remember me" cookies
@@ -0,0 +1,176 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+from metrics import FRAGMENT_CACHE_REQUESTS
+
+
+class LRUCache:
+    """In-process LRU with a TTL; each gunicorn worker has its own."""
+
+    def __init__(self, maxsize=256, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class FileCache:
+    """Fragments as files in a local directory shared by every worker.
+
+    Entries expire ``ttl`` seconds after they were written (by mtime).
+    Every ``PRUNE_EVERY`` writes, expired files are swept and, like the
+    LRU, the oldest are dropped past ``maxsize``: cache keys carry
+    client-supplied cursors, so the directory must not grow with them.
+    """
+
+    PRUNE_EVERY = 200
+
+    def __init__(self, directory, maxsize=256, ttl=300):
+        self.directory = directory
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + ".html")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            if os.path.getmtime(path) + self.ttl < time.time():
+                return None
+            with open(path, encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, value):
+        path = self._path(key)
+        # Write then rename so another worker never reads half a fragment
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(value)
+        os.replace(tmp_path, path)
+
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self.prune(keep=path)
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def prune(self, keep=None):
+        cutoff = time.time() - self.ttl
+        live = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".html"):
+                continue
+            try:
+                mtime = entry.stat().st_mtime
+                if mtime < cutoff:
+                    os.remove(entry.path)
+                elif entry.path != keep:
+                    live.append((mtime, entry.path))
+            except FileNotFoundError:
+                pass
+
+        # Oldest first, never the fragment just written
+        live.sort()
+        for _, path in live[:max(0, len(live) + (keep is not None) - self.maxsize)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def __len__(self):
+        return sum(1 for name in os.listdir(self.directory) if name.endswith(".html"))
+
+
+_cache = None
+_cache_lock = threading.Lock()
+_stats = {"hit": 0, "miss": 0}
+
+
+def get_cache():
+    # Built lazily from config so each gunicorn worker gets its own LRU
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                config = current_app.config
+                if config["FRAGMENT_CACHE_BACKEND"] == "file":
+                    _cache = FileCache(
+                        os.path.join(current_app.root_path, config["FRAGMENT_CACHE_DIR"]),
+                        maxsize=config["FRAGMENT_CACHE_SIZE"],
+                        ttl=config["FRAGMENT_CACHE_TTL"],
+                    )
+                else:
+                    _cache = LRUCache(
+                        maxsize=config["FRAGMENT_CACHE_SIZE"],
+                        ttl=config["FRAGMENT_CACHE_TTL"],
+                    )
+    return _cache
+
+
+def cached_fragment(name, key, render):
+    """Return the cached HTML for ``name``/``key``, rendering it on a miss."""
+    if current_app.config["FRAGMENT_CACHE_BACKEND"] == "none":
+        return render()
+
+    cache = get_cache()
+    full_key = f"{name}:{key}"
+    html = cache.get(full_key)
+    result = "miss" if html is None else "hit"
+    _stats[result] += 1
+    FRAGMENT_CACHE_REQUESTS.labels(name, result).inc()
+    if html is None:
+        html = render()
+        cache.set(full_key, html)
+    return html
+
+
+def cache_stats():
+    """Hit/miss counts for this worker, for /admin/perf."""
+    total = _stats["hit"] + _stats["miss"]
+    return {
+        "backend": current_app.config["FRAGMENT_CACHE_BACKEND"],
+        "entries": len(get_cache()) if current_app.config["FRAGMENT_CACHE_BACKEND"] != "none" else 0,
+        "hits": _stats["hit"],
+        "misses": _stats["miss"],
+        "hit_rate": _stats["hit"] / total if total else None,
+    }
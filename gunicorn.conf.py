@@ -0,0 +1,58 @@
+# Gunicorn settings, loaded automatically by `gunicorn wsgi:app` (see Procfile)
+import os
+import shutil
+
+# Worker model; pooling.py sizes each worker's DB pool from the same variables.
+#   sync    - one request per process (default)
+#   gthread - GUNICORN_THREADS requests per process in OS threads
+#   gevent  - cooperative greenlets: a checkout waiting on Stripe doesn't hold
+#             a whole worker, up to GUNICORN_WORKER_CONNECTIONS per process
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+threads = int(os.getenv("GUNICORN_THREADS", 1))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 1000))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+
+# 🚀 Import the app once in the master so forked workers share those modules
+# copy-on-write and start serving at once. Not under gevent: its
+# monkey-patching has to happen before sockets/ssl are imported.
+preload_app = os.getenv("GUNICORN_PRELOAD", "False" if worker_class == "gevent" else "True") == "True"
+
+# 📈 Prometheus multiprocess mode: each worker writes its metrics to files in
+# this directory and /metrics aggregates them, whichever worker serves it.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/flask_shop_metrics")
+# A preloaded app creates its metrics before on_starting runs, so the
+# directory has to exist already
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+
+def on_starting(server):
+    # Start every deploy from a clean slate so dead workers' files don't linger
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def post_fork(server, worker):
+    if preload_app:
+        # The master's engine (and any pooled connection) must not be shared
+        # across processes; each worker opens its own on first use
+        from wsgi import app
+        from models import db
+
+        with app.app_context():
+            db.engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    if worker_class == "gevent" and os.getenv("DATABASE_URL", "").startswith("postgres"):
+        # gunicorn has monkey-patched sockets (Stripe/requests, smtplib) by now;
+        # psycopg2 is a C extension and needs its own wait callback to yield
+        from psycogreen.gevent import patch_psycopg
+
+        patch_psycopg()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import threading
+
+from flask import current_app, url_for
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# 🖼️ Every upload is stored once per variant and format, named
+# <sha256 of the upload>-<variant>.<ext>, plus <digest>.json with the width
+# each variant really got; the DB keeps "<dir>/<digest>" only
+VARIANTS = {"thumb": 160, "card": 480, "full": 1200}  # max width, px
+FORMATS = {"webp": ("WEBP", {"quality": 80, "method": 6}),
+           "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True})}
+
+
+def _variant_filename(digest, variant, ext):
+    return f"{digest}-{variant}.{ext}"
+
+
+def _manifest_filename(digest):
+    return f"{digest}.json"
+
+
+def save_image(file_storage, folder_key):
+    """Resize an uploaded image into every variant under ``config[folder_key]``.
+
+    Returns the content digest; re-uploading the same bytes reuses the
+    files already on disk. Raises ``ValueError`` if Pillow can't read it.
+    """
+    data = file_storage.read()
+    digest = hashlib.sha256(data).hexdigest()[:32]
+    folder = os.path.join(current_app.root_path, current_app.config[folder_key])
+    paths = {
+        (variant, ext): os.path.join(folder, _variant_filename(digest, variant, ext))
+        for variant in VARIANTS for ext in FORMATS
+    }
+    manifest_path = os.path.join(folder, _manifest_filename(digest))
+    if os.path.exists(manifest_path) and all(os.path.exists(p) for p in paths.values()):
+        return digest
+
+    file_storage.stream.seek(0)
+    try:
+        image = Image.open(file_storage.stream)
+        image.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise ValueError("Unsupported or corrupt image") from e
+
+    # Honour the camera's rotation, then flatten transparency onto white for JPEG
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    else:
+        image = image.convert("RGB")
+
+    os.makedirs(folder, exist_ok=True)
+    widths = {}
+    for variant, width in VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail((width, image.height), Image.LANCZOS)  # never upscales
+        widths[variant] = resized.width
+        for ext, (fmt, options) in FORMATS.items():
+            _write_atomically(paths[(variant, ext)], lambda tmp_path: resized.save(tmp_path, fmt, **options))
+    # Written last: its presence means every variant is on disk
+    _write_atomically(manifest_path, lambda tmp_path: _dump_json(widths, tmp_path))
+    return digest
+
+
+def _write_atomically(path, write):
+    # Write then rename so a half-written file is never served
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _dump_json(data, path):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+# "<dir>/<digest>" -> {variant: width}; files are content-addressed, so never stale
+_widths = {}
+
+
+def _variant_widths(path):
+    widths = _widths.get(path)
+    if widths is None:
+        base = os.path.join(current_app.static_folder, path)
+        try:
+            with open(f"{base}.json") as f:
+                widths = json.load(f)
+        except FileNotFoundError:
+            # Uploaded before manifests existed: read the widths from the files
+            widths = {}
+            for variant in VARIANTS:
+                try:
+                    with Image.open(f"{base}-{variant}.jpeg") as image:
+                        widths[variant] = image.width
+                except OSError:
+                    pass
+        _widths[path] = widths
+    return widths
+
+
+def is_image_set(path):
+    """True for pipeline images ("<dir>/<digest>"); legacy values keep their extension."""
+    return bool(path) and "." not in os.path.basename(path)
+
+
+def image_url(path, variant="card", ext="jpeg"):
+    if not is_image_set(path):
+        return url_for("static", filename=path)
+    return url_for("static", filename=f"{path}-{variant}.{ext}")
+
+
+def image_srcset(path, ext="webp"):
+    """One candidate per distinct real width; a small upload may offer just one."""
+    candidates = {}
+    for variant, width in sorted(_variant_widths(path).items(), key=lambda item: VARIANTS[item[0]]):
+        candidates.setdefault(width, variant)  # same pixels, keep the first variant's URL
+    return ", ".join(f"{image_url(path, variant, ext)} {width}w" for width, variant in candidates.items())
+
+
+def init_app(app):
+    app.add_template_global(is_image_set)
+    app.add_template_global(image_url)
+    app.add_template_global(image_srcset)
@@ -0,0 +1,76 @@
+import logging
+import threading
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from models import db
+
+logger = logging.getLogger(__name__)
+
+# endpoint -> {"requests", "queries", "db_ms", "total_ms"}; per worker process
+_endpoint_stats = {}
+_stats_lock = threading.Lock()
+
+
+def init_app(app):
+    """Count queries and DB time per request and log slow statements."""
+    slow_query_ms = app.config["SLOW_QUERY_THRESHOLD_MS"]
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # Kept on the per-statement context: a statement that fails never
+        # reaches after_cursor_execute, and must not leave a start time
+        # behind on the pooled connection
+        context._query_start_time = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - context._query_start_time) * 1000
+        endpoint = None
+        if has_request_context():
+            endpoint = request.endpoint
+            g.db_queries = g.get("db_queries", 0) + 1
+            g.db_ms = g.get("db_ms", 0.0) + elapsed_ms
+        if elapsed_ms >= slow_query_ms:
+            logger.warning("🐢 Slow query (%.1f ms) in %s: %s", elapsed_ms, endpoint or "<no request>", statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+    app.before_request(_start_request_timer)
+    app.after_request(_record_request)
+
+
+def _start_request_timer():
+    g.request_start_time = time.perf_counter()
+
+
+def _record_request(response):
+    queries = g.get("db_queries", 0)
+    db_ms = g.get("db_ms", 0.0)
+    total_ms = (time.perf_counter() - g.get("request_start_time", time.perf_counter())) * 1000
+
+    response.headers.add(
+        "Server-Timing", f'db;dur={db_ms:.1f};desc="{queries} queries", app;dur={total_ms:.1f}'
+    )
+
+    endpoint = request.endpoint or "<unmatched>"
+    with _stats_lock:
+        stats = _endpoint_stats.setdefault(
+            endpoint, {"requests": 0, "queries": 0, "db_ms": 0.0, "total_ms": 0.0}
+        )
+        stats["requests"] += 1
+        stats["queries"] += queries
+        stats["db_ms"] += db_ms
+        stats["total_ms"] += total_ms
+    return response
+
+
+def endpoint_stats(limit=25):
+    """Endpoints of this worker ordered by total DB time, busiest first."""
+    with _stats_lock:
+        rows = [dict(stats, endpoint=endpoint) for endpoint, stats in _endpoint_stats.items()]
+    rows.sort(key=lambda row: row["db_ms"], reverse=True)
+    return rows[:limit]
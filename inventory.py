@@ -0,0 +1,171 @@
+import logging
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from metrics import OVERSOLD_LINES
+from models import db, Order, OrderItem, Product
+
+logger = logging.getLogger(__name__)
+
+# 📦 Stock is taken when checkout() opens a Stripe session, not when it is
+# paid, so two buyers can never both pay for the last unit. Every change is
+# a single conditional UPDATE: the row lock lives for one statement, not for
+# a SELECT ... FOR UPDATE held across the Stripe call.
+#
+#   reserved  -> confirmed   payment (mark_order_paid)
+#   reserved  -> released    cancel, session expiry, sweep; stock goes back
+#
+# Products with stock NULL (left blank in the admin forms) are not tracked.
+RESERVED, CONFIRMED, RELEASED = "reserved", "confirmed", "released"
+
+
+class OutOfStock(Exception):
+    def __init__(self, product_id, name, available):
+        super().__init__(f"Only {available or 0} of {name} left")
+        self.product_id = product_id
+        self.name = name
+        self.available = available or 0
+
+
+def reserve_stock(lines):
+    """Take stock for ``lines`` (``{"id", "name", "quantity"}`` dicts), in the caller's transaction.
+
+    Raises ``OutOfStock`` at the first line that can't be covered; the
+    caller rolls back, which returns anything already taken.
+    """
+    # Same lock order in every transaction, so two carts can't deadlock
+    for line in sorted(lines, key=lambda line: line["id"]):
+        taken = db.session.execute(
+            db.update(Product)
+            .where(
+                Product.id == line["id"],
+                db.or_(Product.stock.is_(None), Product.stock >= line["quantity"]),
+            )
+            .values(stock=Product.stock - line["quantity"])
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not taken:
+            available = db.session.execute(
+                db.select(Product.stock).where(Product.id == line["id"])
+            ).scalar()
+            raise OutOfStock(line["id"], line["name"], available)
+
+
+def _transition(order, to_status, from_status=RESERVED):
+    # Guarded flip: of two racing callers (cancel vs. webhook, webhook vs.
+    # sweep) exactly one sees rowcount 1 and acts on it. Leaving "reserved"
+    # also frees the checkout key, so the same cart can be bought again.
+    flipped = db.session.execute(
+        db.update(Order)
+        .where(Order.id == order.id, Order.reservation_status == from_status)
+        .values(reservation_status=to_status, checkout_key=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if flipped:
+        order.reservation_status = to_status
+        order.checkout_key = None
+    return bool(flipped)
+
+
+def reserved_units(product_ids):
+    """Units of each product held by open checkouts: ``{product_id: quantity}``.
+
+    Stock already excludes them, and they go back on top of it when their
+    checkout is abandoned.
+    """
+    if not product_ids:
+        return {}
+    return dict(db.session.execute(
+        db.select(OrderItem.product_id, db.func.sum(OrderItem.quantity))
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(Order.reservation_status == RESERVED, OrderItem.product_id.in_(product_ids))
+        .group_by(OrderItem.product_id)
+    ).all())
+
+
+def release_reservation(order):
+    """Put a reserved order's stock back, once. Returns False if it wasn't reserved."""
+    if not _transition(order, RELEASED):
+        return False
+
+    quantities = db.session.execute(
+        db.select(OrderItem.product_id, db.func.sum(OrderItem.quantity))
+        .where(OrderItem.order_id == order.id)
+        .group_by(OrderItem.product_id)
+        .order_by(OrderItem.product_id)
+    ).all()
+    for product_id, quantity in quantities:
+        db.session.execute(
+            db.update(Product)
+            .where(Product.id == product_id, Product.stock.isnot(None))
+            .values(stock=Product.stock + quantity)
+            .execution_options(synchronize_session=False)
+        )
+    return True
+
+
+def confirm_reservation(order):
+    """Make a paid order's reservation permanent, in the caller's transaction."""
+    if _transition(order, CONFIRMED):
+        return True
+    if _transition(order, CONFIRMED, from_status=RELEASED):
+        # Paid after its stock went back (e.g. a very late webhook after the
+        # sweep): the customer has paid, so the stock is taken regardless
+        logger.warning("Order #%s paid after its reservation was released", order.id)
+        for item in order.order_items:
+            taken = db.session.execute(
+                db.update(Product)
+                .where(Product.id == item.product_id, Product.stock >= item.quantity)
+                .values(stock=Product.stock - item.quantity)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if taken:
+                continue
+            # Those units were sold again meanwhile: floor at 0, and make
+            # sure a human sees it, since this order can't be fulfilled
+            oversold = db.session.execute(
+                db.update(Product)
+                .where(Product.id == item.product_id, Product.stock < item.quantity)
+                .values(stock=0)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if oversold:
+                OVERSOLD_LINES.inc()
+                logger.error(
+                    "🚨 Oversold: order #%s paid for %s x %s after its reservation was released; stock set to 0",
+                    order.id, item.quantity, item.product_name,
+                )
+    return False
+
+
+def release_expired(older_than):
+    """Release unpaid reservations opened before ``older_than``. Returns the count."""
+    orders = Order.query.filter(
+        Order.reservation_status == RESERVED,
+        Order.is_paid.is_(False),
+        Order.date < older_than,
+    ).all()
+    released = sum(release_reservation(order) for order in orders)
+    db.session.commit()
+    return released
+
+
+def reservation_expires_at():
+    """Unix time for the Stripe session's ``expires_at``."""
+    # Stripe accepts between 30 minutes and 24 hours out
+    minutes = min(max(current_app.config["CHECKOUT_RESERVATION_MINUTES"], 30), 24 * 60)
+    return int(time.time()) + minutes * 60
+
+
+@click.command("release-reservations")
+@with_appcontext
+def release_reservations_command():
+    """Release stock held by checkouts that were never paid (missed expiry webhooks)."""
+    # Well past the Stripe session expiry, so a late payment webhook has landed
+    minutes = current_app.config["CHECKOUT_RESERVATION_MINUTES"] + 60
+    released = release_expired(datetime.utcnow() - timedelta(minutes=minutes))
+    click.echo(f"✅ Released {released} expired reservation(s)")
@@ -0,0 +1,90 @@
+import glob
+import hashlib
+import os
+import threading
+
+from flask import current_app, render_template, request, url_for
+
+from background import submit
+from metrics import PDF_RENDER_SECONDS
+from models import db, Order
+
+_template_digest = None
+
+
+def _invoice_template_digest():
+    # Editing invoice.html must invalidate every cached PDF
+    global _template_digest
+    if _template_digest is None:
+        env = current_app.jinja_env
+        source = env.loader.get_source(env, "invoice.html")[0]
+        _template_digest = hashlib.sha256(source.encode()).hexdigest()
+    return _template_digest
+
+
+def invoice_key(order):
+    """Content hash of everything that ends up on the invoice for ``order``."""
+    inputs = (
+        order.id,
+        order.user_id,
+        order.total,
+        order.is_paid,
+        order.date.isoformat() if order.date else None,
+        [(i.product_name, i.quantity, i.price) for i in order.order_items],
+        _invoice_template_digest(),
+    )
+    return hashlib.sha256(repr(inputs).encode()).hexdigest()[:32]
+
+
+def _cache_dir():
+    return os.path.join(current_app.root_path, current_app.config["INVOICE_CACHE_DIR"])
+
+
+def invoice_path(order, key=None):
+    return os.path.join(_cache_dir(), f"invoice_{order.id}_{key or invoice_key(order)}.pdf")
+
+
+def render_invoice(order):
+    """Return the path of the cached invoice PDF, rendering it on a miss.
+
+    Must run inside a request context so ``url_for(..., _external=True)``
+    and the WeasyPrint ``base_url`` resolve.
+    """
+    path = invoice_path(order)
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(_cache_dir(), exist_ok=True)
+    logo_url = url_for("static", filename="favicon.ico", _external=True)
+    rendered = render_template("invoice.html", order=order, logo_url=logo_url)
+
+    # 🐢 Imported on first render: WeasyPrint loads Pango and its font and
+    # CSS stack, which web workers and CLI commands otherwise never need
+    from weasyprint import HTML
+
+    # Write then rename so concurrent readers never see a half-written PDF
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with PDF_RENDER_SECONDS.time():
+        HTML(string=rendered, base_url=request.root_url).write_pdf(tmp_path)
+    os.replace(tmp_path, path)
+
+    # 🧹 Drop renders of this order whose inputs have since changed
+    for stale in glob.glob(os.path.join(_cache_dir(), f"invoice_{order.id}_*.pdf")):
+        if stale != path:
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+    return path
+
+
+def _prerender(order_id, base_url):
+    with current_app.test_request_context(base_url=base_url):
+        order = db.session.get(Order, order_id)
+        if order:
+            return render_invoice(order)
+
+
+def prerender_invoice(order):
+    """Render ``order``'s invoice on the background pool; returns a Future."""
+    return submit(_prerender, order.id, request.root_url)
@@ -0,0 +1,181 @@
+import logging
+import smtplib
+import socket
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from flask_mail import Message
+
+from invoices import invoice_path, render_invoice
+from metrics import track_external
+from models import db, Order, OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(recipient, subject, html, invoice_order_id=None):
+    """Queue an email for the mail worker; it is sent when the caller commits."""
+    email = OutboundEmail(
+        recipient=recipient,
+        subject=subject,
+        html=html,
+        invoice_order_id=invoice_order_id,
+    )
+    db.session.add(email)
+    return email
+
+
+def _invoice_pdf(order_id):
+    order = db.session.get(Order, order_id)
+    path = invoice_path(order)
+    try:
+        with open(path, "rb") as f:
+            return order, f.read()
+    except FileNotFoundError:
+        # Background pre-render hasn't landed (or failed); render it here
+        base_url = current_app.config["SHOP_BASE_URL"]
+        with current_app.test_request_context(base_url=base_url):
+            with open(render_invoice(order), "rb") as f:
+                return order, f.read()
+
+
+def _build_message(email):
+    msg = Message(subject=email.subject, recipients=[email.recipient], html=email.html)
+    if email.invoice_order_id:
+        order, pdf = _invoice_pdf(email.invoice_order_id)
+        msg.attach(
+            filename=f"invoice_order_{order.id}.pdf",
+            content_type="application/pdf",
+            data=pdf,
+        )
+    return msg
+
+
+def _schedule_retry(email, error):
+    email.attempts += 1
+    email.last_error = repr(error)
+    if email.attempts >= current_app.config["MAIL_MAX_ATTEMPTS"]:
+        email.status = "failed"
+        logger.error("Giving up on email #%s to %s: %r", email.id, email.recipient, error)
+        return
+    # Exponential backoff: base, 2x base, 4x base, ...
+    delay = current_app.config["MAIL_RETRY_BASE_SECONDS"] * 2 ** (email.attempts - 1)
+    email.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+    logger.warning("Email #%s failed (attempt %s), retrying in %ss: %r", email.id, email.attempts, delay, error)
+
+
+def _postpone(emails, error):
+    # Not their fault (the relay went away): try again later without using up an attempt
+    retry_at = datetime.utcnow() + timedelta(seconds=current_app.config["MAIL_RETRY_BASE_SECONDS"])
+    for email in emails:
+        email.last_error = repr(error)
+        email.next_attempt_at = retry_at
+    if emails:
+        logger.warning("SMTP connection lost, %s email(s) postponed: %r", len(emails), error)
+
+
+def _claim_batch(batch_size):
+    """Lease up to ``batch_size`` due emails to this worker and commit.
+
+    Pushing next_attempt_at forward by MAIL_LEASE_SECONDS takes them off
+    every other worker's due list, so no row lock is held while invoices
+    render or SMTP is slow. If this worker dies, they come due again when
+    the lease runs out.
+    """
+    ids = db.session.scalars(
+        db.select(OutboundEmail.id)
+        .where(OutboundEmail.status == "pending", OutboundEmail.next_attempt_at <= datetime.utcnow())
+        .order_by(OutboundEmail.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)  # lets several workers share the outbox on PostgreSQL
+    ).all()
+    if not ids:
+        db.session.commit()
+        return []
+    db.session.execute(
+        db.update(OutboundEmail)
+        .where(OutboundEmail.id.in_(ids))
+        .values(next_attempt_at=datetime.utcnow() + timedelta(seconds=current_app.config["MAIL_LEASE_SECONDS"]))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return OutboundEmail.query.filter(OutboundEmail.id.in_(ids)).order_by(OutboundEmail.id).all()
+
+
+def _send_batch(unsent):
+    """Send ``unsent`` in order over one connection, removing each email once it is settled.
+
+    Raises SMTPServerDisconnected if the server drops the connection; the
+    email in flight is then still first in ``unsent``.
+    """
+    with current_app.extensions["mail"].connect() as conn:
+        while unsent:
+            email = unsent[0]
+            try:
+                msg = _build_message(email)
+                with track_external("smtp"):
+                    conn.send(msg)
+            except smtplib.SMTPServerDisconnected:
+                conn.host = None  # nothing left to QUIT on the way out
+                raise
+            except Exception as e:
+                _schedule_retry(email, e)
+            else:
+                email.status = "sent"
+                email.sent_at = datetime.utcnow()
+            unsent.pop(0)
+
+
+def drain_outbox(batch_size=50):
+    """Send one batch of due emails over a single SMTP connection.
+
+    Returns how many emails were attempted. Delivery is at-least-once: a
+    crash after sending but before the commit re-sends that batch.
+    """
+    batch = _claim_batch(batch_size)
+    if not batch:
+        return 0
+
+    unsent = list(batch)
+    try:
+        _send_batch(unsent)
+    except smtplib.SMTPServerDisconnected:
+        # 🔌 Dropped mid-batch: reconnect once and carry on from the same email
+        dropped_on = unsent[0]
+        try:
+            _send_batch(unsent)
+        except Exception as e:
+            # Still no relay: end the batch. An email that dropped the
+            # connection twice is charged (it may be the cause), the rest wait
+            if isinstance(e, smtplib.SMTPServerDisconnected) and unsent[0] is dropped_on:
+                _schedule_retry(unsent.pop(0), e)
+            _postpone(unsent, e)
+    except Exception as e:
+        # Could not connect: retry whatever is left
+        for email in unsent:
+            _schedule_retry(email, e)
+
+    db.session.commit()
+    return len(batch)
+
+
+@click.command("mail-worker")
+@click.option("--batch-size", default=50, show_default=True, help="Emails sent per SMTP connection.")
+@click.option("--interval", default=5.0, show_default=True, help="Seconds to sleep when nothing is due.")
+@click.option("--once", is_flag=True, help="Drain everything that is due, then exit.")
+@with_appcontext
+def mail_worker_command(batch_size, interval, once):
+    """Deliver queued outbound emails."""
+    # Flask-Mail opens smtplib connections without a timeout; don't let a
+    # stuck relay hang the worker forever
+    socket.setdefaulttimeout(current_app.config["MAIL_TIMEOUT"])
+    click.echo("📨 Mail worker started")
+    while True:
+        if drain_outbox(batch_size):
+            continue
+        if once:
+            break
+        time.sleep(interval)
@@ -0,0 +1,138 @@
+import os
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+
+from models import db
+
+# 📈 With PROMETHEUS_MULTIPROC_DIR set (see gunicorn.conf.py) every worker
+# writes these to shared files and /metrics merges them.
+REQUEST_LATENCY = Histogram(
+    "flask_request_duration_seconds",
+    "Request latency by Flask endpoint",
+    ["endpoint", "method", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "flask_requests_in_flight",
+    "Requests currently being handled",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Connections checked out of the pool")
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Overflow connections open beyond pool_size",
+    multiprocess_mode="livemax",
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled DB connection",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10),
+)
+PDF_RENDER_SECONDS = Histogram(
+    "invoice_pdf_render_seconds",
+    "WeasyPrint invoice render time",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10),
+)
+EXTERNAL_CALL_SECONDS = Histogram(
+    "external_call_duration_seconds",
+    "Latency of calls to Stripe and SMTP",
+    ["service", "outcome"],
+)
+FRAGMENT_CACHE_REQUESTS = Counter(
+    "fragment_cache_requests_total",
+    "Rendered-fragment cache lookups",
+    ["fragment", "result"],
+)
+OVERSOLD_LINES = Counter(
+    "stock_oversold_order_lines_total",
+    "Order lines paid for after their reservation was released and the stock resold; alert on any",
+)
+USER_CACHE_REQUESTS = Counter(
+    "user_principal_cache_requests_total",
+    "Logged-in user lookups served from the principal cache",
+    ["result"],
+)
+
+
+@contextmanager
+def track_external(service):
+    """Time a call to an upstream ``service`` ("stripe", "smtp", ...)."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        EXTERNAL_CALL_SECONDS.labels(service, outcome).observe(time.perf_counter() - start)
+
+
+def init_app(app):
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule("/metrics", "metrics", metrics_view)
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.inc()
+        DB_POOL_CHECKED_OUT.inc()
+        overflow = getattr(engine.pool, "overflow", None)
+        if overflow is not None:
+            DB_POOL_OVERFLOW.set(max(overflow(), 0))
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.dec()
+
+
+def _before_request():
+    g.metrics_start_time = time.perf_counter()
+    REQUESTS_IN_FLIGHT.inc()
+
+
+def _after_request(response):
+    g.metrics_status = response.status_code
+    return response
+
+
+def _teardown_request(exc):
+    # Teardown runs even when the view raised, so the gauge can't leak
+    start = g.pop("metrics_start_time", None)
+    if start is None:
+        return
+    REQUESTS_IN_FLIGHT.dec()
+    REQUEST_LATENCY.labels(
+        request.endpoint or "<unmatched>",
+        request.method,
+        str(g.pop("metrics_status", 500)),
+    ).observe(time.perf_counter() - start)
+
+
+def metrics_view():
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    # content_type, not mimetype: CONTENT_TYPE_LATEST already carries its charset
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
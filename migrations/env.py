@@ -90,9 +90,21 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # search.py keeps its full-text objects outside the models (the FTS5
+    # table and its shadow tables, the tsvector column and its index), so
+    # autogenerate must not try to drop them
+    def include_object(object, name, type_, reflected, compare_to):
+        if type_ == "table" and name.startswith("product_fts"):
+            return False
+        if name in ("search_vector", "ix_product_search_vector"):
+            return False
+        return True
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
 
     connectable = get_engine()
 
@@ -0,0 +1,40 @@
+"""Add daily_sales rollup table
+
+Revision ID: 3f9c2b7d1e40
+Revises: add_stock_field
+Create Date: 2025-11-03 10:12:45.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2b7d1e40'
+down_revision = 'add_stock_field'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_sales',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+
+    # Backfill the rollup from the orders that are already paid
+    if op.get_bind().dialect.name == 'sqlite':
+        day = 'date("date")'
+    else:
+        day = 'CAST("date" AS DATE)'
+    op.execute(
+        f'INSERT INTO daily_sales (day, order_count, revenue) '
+        f'SELECT {day}, COUNT(*), SUM(total) FROM "order" '
+        f'WHERE is_paid AND "date" IS NOT NULL GROUP BY {day}'
+    )
+
+
+def downgrade():
+    op.drop_table('daily_sales')
@@ -0,0 +1,59 @@
+"""Add stripe_event webhook inbox, replacing processed_stripe_event
+
+Revision ID: 4c7d2a9e1b56
+Revises: 8b3d6f2e4a15
+Create Date: 2025-11-18 09:12:41.503127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c7d2a9e1b56'
+down_revision = '8b3d6f2e4a15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stripe_event',
+    sa.Column('id', sa.String(length=255), nullable=False),
+    sa.Column('type', sa.String(length=100), nullable=False),
+    sa.Column('session_id', sa.String(length=255), nullable=True),
+    sa.Column('payment_status', sa.String(length=50), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('received_at', sa.DateTime(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('stripe_event', schema=None) as batch_op:
+        batch_op.create_index('ix_stripe_event_status_next_attempt_at', ['status', 'next_attempt_at'], unique=False)
+
+    # Events already applied stay known, so a late redelivery is still a no-op
+    op.execute(
+        "INSERT INTO stripe_event (id, type, status, attempts, next_attempt_at, received_at, processed_at) "
+        "SELECT id, type, 'processed', 0, COALESCE(processed_at, CURRENT_TIMESTAMP), processed_at, processed_at "
+        "FROM processed_stripe_event"
+    )
+    op.drop_table('processed_stripe_event')
+
+
+def downgrade():
+    op.create_table('processed_stripe_event',
+    sa.Column('id', sa.String(length=255), nullable=False),
+    sa.Column('type', sa.String(length=100), nullable=False),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(
+        "INSERT INTO processed_stripe_event (id, type, processed_at) "
+        "SELECT id, type, processed_at FROM stripe_event WHERE status = 'processed'"
+    )
+    with op.batch_alter_table('stripe_event', schema=None) as batch_op:
+        batch_op.drop_index('ix_stripe_event_status_next_attempt_at')
+
+    op.drop_table('stripe_event')
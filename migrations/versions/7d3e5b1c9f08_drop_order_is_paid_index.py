@@ -0,0 +1,32 @@
+"""Drop ix_order_is_paid_id; the newest-unpaid-order lookup is gone
+
+Revision ID: 7d3e5b1c9f08
+Revises: 4c7d2a9e1b56
+Create Date: 2025-11-21 10:27:54.318046
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d3e5b1c9f08'
+down_revision = '4c7d2a9e1b56'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_order_is_paid_id', table_name='order', postgresql_concurrently=True, if_exists=True)
+    else:
+        op.drop_index('ix_order_is_paid_id', table_name='order')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index('ix_order_is_paid_id', 'order', ['is_paid', 'id'], postgresql_concurrently=True, if_not_exists=True)
+    else:
+        op.create_index('ix_order_is_paid_id', 'order', ['is_paid', 'id'])
@@ -0,0 +1,58 @@
+"""Add full-text search over product name and description
+
+SQLite gets an FTS5 table (kept in sync by search.py); PostgreSQL gets a
+generated, GIN-indexed tsvector column.
+
+Revision ID: c7e4a9f2b318
+Revises: 0b5d2e9c7a14
+Create Date: 2025-11-14 10:26:53.118402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e4a9f2b318'
+down_revision = '0b5d2e9c7a14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE product_fts USING fts5("
+            "name, description, tokenize = 'porter unicode61', prefix = '2 3')"
+        )
+        op.execute(
+            "INSERT INTO product_fts (rowid, name, description) "
+            "SELECT id, name, coalesce(description, '') FROM product"
+        )
+    elif dialect == 'postgresql':
+        op.execute(
+            "ALTER TABLE product ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+            ") STORED"
+        )
+        # CONCURRENTLY keeps product writable while the index builds
+        with op.get_context().autocommit_block():
+            op.create_index(
+                'ix_product_search_vector', 'product', ['search_vector'],
+                postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TABLE product_fts")
+    elif dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index(
+                'ix_product_search_vector', table_name='product',
+                postgresql_concurrently=True, if_exists=True,
+            )
+        op.drop_column('product', 'search_vector')
@@ -0,0 +1,48 @@
+"""Add indexes for order and order item lookups
+
+Revision ID: d1e7a3f4b820
+Revises: c52e8f1a9b63
+Create Date: 2025-11-08 14:03:11.902384
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd1e7a3f4b820'
+down_revision = 'c52e8f1a9b63'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_order_user_id_date', 'order', ['user_id', 'date']),
+    ('ix_order_date', 'order', ['date']),
+    ('ix_order_is_paid_id', 'order', ['is_paid', 'id']),
+    ('ix_order_shipping_status', 'order', ['shipping_status']),
+    ('ix_order_item_order_id', 'order_item', ['order_id']),
+    ('ix_order_item_product_id', 'order_item', ['product_id']),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        # CONCURRENTLY can't run inside a transaction, and it keeps the
+        # tables writable while the indexes build
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    else:
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table)
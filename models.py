@@ -1,5 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 
 db = SQLAlchemy() # Create db object here(no import from app)
@@ -18,7 +19,12 @@ class Product(db.Model):
   price = db.Column(db.Float, nullable=False)
   description = db.Column(db.String(200))
   image = db.Column(db.String(200), nullable=True)
-  stock = db.Column(db.Integer, default=0) # 🆕 new field
+  stock = db.Column(db.Integer, nullable=True) # 🆕 units left; NULL = not tracked (never sold out), see inventory.py
+  updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow) # 🆕 feeds the catalog ETag
+
+  __table_args__ = (
+    db.Index("ix_product_updated_at", "updated_at"),  # max(updated_at) without a scan
+  )
 
 class Order(db.Model):
   id = db.Column(db.Integer, primary_key=True)
@@ -26,6 +32,10 @@ class Order(db.Model):
   date = db.Column(db.DateTime, default=datetime.utcnow)
   total = db.Column(db.Float, nullable=False)
   is_paid = db.Column(db.Boolean, default=False)
+  updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow) # 🆕 also bumped by bulk UPDATEs
+  stripe_session_id = db.Column(db.String(255), nullable=True) # 🆕 Checkout Session that pays for this order
+  reservation_status = db.Column(db.String(20), nullable=True) # 🆕 reserved / confirmed / released, see inventory.py
+  checkout_key = db.Column(db.String(64), nullable=True) # 🆕 idempotency key while the checkout is open
 
   # 🆕 Multiple shipping stages
   shipping_status = db.Column(db.String(50), default="Processing") # current stage
@@ -39,9 +49,29 @@ class Order(db.Model):
 
 
   order_items = db.relationship("OrderItem", backref="order", lazy=True)
+  user = db.relationship("User", backref=db.backref("orders", lazy=True))
+
+  # 🔎 Match the hot access paths: a user's orders by date, the admin list by
+  # date, and counts by shipping stage
+  __table_args__ = (
+    db.Index("ix_order_user_id_date", "user_id", "date"),
+    db.Index("ix_order_date", "date"),
+    db.Index("ix_order_shipping_status", "shipping_status"),
+    db.Index("ix_order_reservation_status_date", "reservation_status", "date"),
+    db.UniqueConstraint("stripe_session_id", name="uq_order_stripe_session_id"),
+    db.UniqueConstraint("checkout_key", name="uq_order_checkout_key"),
+  )
 
   def __repr__(self):
         return f"<Order {self.id} - Paid: {self.is_paid}>"
+
+# 🚚 Shipping stage -> (shipping_stage_index, timeline column stamped on entry)
+SHIPPING_STAGES = {
+  "Processing": (0, "processing_date"),
+  "Shipped": (1, "shipped_date"),
+  "In Transit": (2, "in_transit_date"),
+  "Delivered": (3, "delivered_date"),
+}
   
 class OrderItem(db.Model):
   id = db.Column(db.Integer, primary_key=True)
@@ -53,6 +83,117 @@ class OrderItem(db.Model):
 
   product = db.relationship("Product", backref="order_items")
 
+  __table_args__ = (
+    db.Index("ix_order_item_order_id", "order_id"),
+    db.Index("ix_order_item_product_id", "product_id"),
+  )
+
+class Cart(db.Model):
+  # 🛒 Server-side cart (CART_BACKEND = "database"), one per user
+  id = db.Column(db.Integer, primary_key=True)
+  user_id = db.Column(db.Integer, db.ForeignKey("user.id"), unique=True, nullable=False)
+  created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+  items = db.relationship("CartItem", backref="cart", lazy=True, cascade="all, delete-orphan")
+
+class CartItem(db.Model):
+  id = db.Column(db.Integer, primary_key=True)
+  cart_id = db.Column(db.Integer, db.ForeignKey("cart.id"), nullable=False)
+  product_id = db.Column(db.Integer, db.ForeignKey("product.id", ondelete="CASCADE"), nullable=False)
+  quantity = db.Column(db.Integer, nullable=False, default=1)
+
+  __table_args__ = (db.UniqueConstraint("cart_id", "product_id", name="uq_cart_item_cart_id_product_id"),)
+
+class OutboundEmail(db.Model):
+  # 📨 Outbox row; the `flask mail-worker` process delivers these over SMTP
+  id = db.Column(db.Integer, primary_key=True)
+  recipient = db.Column(db.String(150), nullable=False)
+  subject = db.Column(db.String(255), nullable=False)
+  html = db.Column(db.Text, nullable=False)
+  invoice_order_id = db.Column(db.Integer, db.ForeignKey("order.id"), nullable=True) # attach this order's invoice
+  status = db.Column(db.String(20), nullable=False, default="pending") # pending / sent / failed
+  attempts = db.Column(db.Integer, nullable=False, default=0)
+  next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+  last_error = db.Column(db.Text, nullable=True)
+  created_at = db.Column(db.DateTime, default=datetime.utcnow)
+  sent_at = db.Column(db.DateTime, nullable=True)
+
+  __table_args__ = (db.Index("ix_outbound_email_status_next_attempt_at", "status", "next_attempt_at"),)
+
+class StripeEvent(db.Model):
+  # 📥 Webhook inbox: stored before Stripe gets its 200, applied by the
+  # background pool or `flask stripe-worker`; the id makes redeliveries no-ops
+  id = db.Column(db.String(255), primary_key=True)
+  type = db.Column(db.String(100), nullable=False)
+  session_id = db.Column(db.String(255), nullable=True) # the Checkout Session it is about
+  payment_status = db.Column(db.String(50), nullable=True)
+  status = db.Column(db.String(20), nullable=False, default="pending") # pending / processed / failed
+  attempts = db.Column(db.Integer, nullable=False, default=0)
+  next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+  last_error = db.Column(db.Text, nullable=True)
+  received_at = db.Column(db.DateTime, default=datetime.utcnow)
+  processed_at = db.Column(db.DateTime, nullable=True)
+
+  __table_args__ = (db.Index("ix_stripe_event_status_next_attempt_at", "status", "next_attempt_at"),)
+
+class DailySales(db.Model):
+  # 📊 Pre-aggregated paid-order totals, one row per day (UTC)
+  day = db.Column(db.Date, primary_key=True)
+  order_count = db.Column(db.Integer, nullable=False, default=0)
+  revenue = db.Column(db.Float, nullable=False, default=0)
+
+  @classmethod
+  def record(cls, order):
+    """Add a newly paid order to its day's rollup, in the caller's transaction."""
+    day = (order.date or datetime.utcnow()).date()
+    bump = (
+      db.update(cls)
+      .where(cls.day == day)
+      .values(order_count=cls.order_count + 1, revenue=cls.revenue + order.total)
+    )
+    if db.session.execute(bump).rowcount:
+      return
+    try:
+      with db.session.begin_nested():
+        db.session.add(cls(day=day, order_count=1, revenue=order.total))
+    except IntegrityError:
+      # Another worker created today's row first
+      db.session.execute(bump)
+
+class CatalogVersion(db.Model):
+  # 🧊 Single-row counter bumped by every catalog write; cached storefront
+  # fragments are keyed by it, so a bump makes all of them unreachable
+  id = db.Column(db.Integer, primary_key=True)
+  version = db.Column(db.Integer, nullable=False, default=0)
+  _validators_stmt = None
+
+  @classmethod
+  def validators(cls):
+    """Cheap fingerprint of the whole catalog, for ETags: (version, max(product.updated_at)).
+
+    Inserts and edits move max(updated_at), an index lookup; deletes bump
+    the version. One round trip, no table scan.
+    """
+    if cls._validators_stmt is None:
+      # Built once: on a 304 constructing the statement costs more than running it
+      cls._validators_stmt = db.select(
+        db.select(cls.version).where(cls.id == 1).scalar_subquery(),
+        db.select(db.func.max(Product.updated_at)).scalar_subquery(),
+      )
+    return db.session.execute(cls._validators_stmt).one()
+
+  @classmethod
+  def bump(cls):
+    """Invalidate cached catalog fragments, in the caller's transaction."""
+    bump = db.update(cls).where(cls.id == 1).values(version=cls.version + 1)
+    if db.session.execute(bump).rowcount:
+      return
+    try:
+      with db.session.begin_nested():
+        db.session.add(cls(id=1, version=1))
+    except IntegrityError:
+      db.session.execute(bump)
+
 
 # Run create_all inside app context
 if __name__ == "__main__":
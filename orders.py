@@ -0,0 +1,289 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+from flask import Blueprint, current_app, flash, jsonify, redirect, render_template, request, send_file, url_for
+from flask_login import current_user, login_required
+
+from background import submit
+from cart_store import get_cart
+from conditional import conditional, page_etag
+from inventory import RESERVED, OutOfStock, release_reservation, reservation_expires_at
+from invoices import invoice_key, invoice_path, prerender_invoice, render_invoice
+from metrics import track_external
+from models import db, Order
+from payments import (
+    checkout_key,
+    create_pending_order,
+    STRIPE_EVENT_HANDLERS,
+    mark_order_paid,
+    process_stripe_event,
+    store_stripe_event,
+    stripe_api,
+)
+
+# 🧾 Checkout, Stripe callbacks, order history and invoices
+bp = Blueprint("orders", __name__)
+
+
+@bp.route("/orders")
+@login_required
+def orders():
+    # Checkouts create their order up front; only paid ones are orders to the buyer
+    latest, count = db.session.execute(
+        db.select(db.func.max(Order.updated_at), db.func.count(Order.id))
+        .where(Order.user_id == current_user.id, Order.is_paid.is_(True))
+    ).one()
+    return conditional(
+        page_etag("orders", latest, count),
+        latest,
+        lambda: render_template(
+            "orders.html", orders=Order.query.filter_by(user_id=current_user.id, is_paid=True).all()
+        ),
+    )
+
+
+@bp.route("/order/<int:order_id>")
+@login_required
+def order_detail(order_id):
+    # Items are only loaded (lazily, by the template) when we actually render
+    order = Order.query.filter_by(id=order_id, user_id=current_user.id, is_paid=True).first_or_404()
+    return conditional(
+        page_etag("order", order.id, order.updated_at),
+        order.updated_at,
+        lambda: render_template("order_detail.html", order=order),
+    )
+
+
+@bp.route("/order/<int:order_id>/invoice")
+@login_required
+def download_invoice(order_id):
+    order = Order.query.filter_by(id=order_id, user_id=current_user.id, is_paid=True).first_or_404()
+    return _send_invoice(order, as_attachment=False, download_name=f"invoice_order_{order.id}.pdf")
+
+
+@bp.route("/order/<int:order_id>/invoice/pdf")
+@login_required
+def download_invoice_pdf(order_id):
+    order = Order.query.filter_by(id=order_id, user_id=current_user.id, is_paid=True).first_or_404()
+    return _send_invoice(order, as_attachment=True, download_name=f"invoice_{order.id}.pdf")
+
+
+def _send_invoice(order, as_attachment, download_name):
+    # 🔁 A revalidating client gets its 304 before we load items or touch the PDF
+    etag = page_etag("invoice", order.id, order.updated_at)
+
+    def render():
+        # 🧾 Stream the cached PDF (Range handled by send_file); render only on a miss
+        path = invoice_path(order, invoice_key(order))
+        if not os.path.exists(path):
+            path = render_invoice(order)
+        return send_file(
+            path,
+            mimetype="application/pdf",
+            as_attachment=as_attachment,
+            download_name=download_name,
+            etag=etag,
+            last_modified=order.updated_at,
+            conditional=True,
+        )
+
+    return conditional(etag, order.updated_at, render)
+
+
+@bp.route("/checkout")
+@login_required
+def checkout():
+    cart, total = get_cart().priced()
+    if not cart:
+        flash("Your cart is empty!")
+        return redirect(url_for("storefront.cart"))
+
+    # 🧾 Pending order, its items and its stock hold in one transaction,
+    # committed before we wait on Stripe so no row stays locked. Reloading
+    # /checkout with the same cart finds that order instead of making another.
+    try:
+        order, created = create_pending_order(current_user.id, cart, total, checkout_key(current_user.id, cart))
+    except OutOfStock as e:
+        flash(f"⚠️ Sorry, only {e.available} of {e.name} left. Please update your cart.")
+        return redirect(url_for("storefront.cart"))
+    if not created:
+        return _resume_checkout(order)
+
+    # Create Stripe line items
+    line_items = []
+    for item in cart:
+        line_items.append({
+            "price_data": {
+                "currency": "usd",
+                "product_data": {"name": item["name"]},
+                "unit_amount": int(item["price"] * 100),  # convert to cents
+            },
+            "quantity": item["quantity"],
+        })
+    
+    # Create Stripe Checkout Session
+    stripe = stripe_api()
+    try:
+        with track_external("stripe"):
+            session_data = stripe.checkout.Session.create(
+              payment_method_types=["card"],
+              line_items=line_items,
+              mode="payment",
+              # Stripe fills in {CHECKOUT_SESSION_ID}, so the return trip names its order
+              success_url=url_for("orders.payment_success", _external=True) + "?session_id={CHECKOUT_SESSION_ID}",
+              cancel_url=url_for("orders.checkout_cancel", order_id=order.id, _external=True),
+              # ⏳ The reservation lasts as long as the session; expiry fires a webhook that releases it
+              expires_at=reservation_expires_at(),
+              metadata={"order_id": order.id},
+              idempotency_key=f"checkout-order-{order.id}",
+              customer_email=f"{current_user.username}@example.com"  # optional 
+            )
+    except Exception as e:
+        # No session will ever point at this order: give its stock back now
+        # rather than holding it until `flask release-reservations`
+        release_reservation(order)
+        db.session.commit()
+        if not isinstance(e, stripe.error.StripeError):
+            raise
+        flash("⚠️ We couldn't reach the payment provider. Please try again.")
+        return redirect(url_for("storefront.cart"))
+
+    # Saved only while the hold is still ours: if this call outlived the grace
+    # period, a reload has already released the order as abandoned
+    saved = db.session.execute(
+        db.update(Order)
+        .where(Order.id == order.id, Order.reservation_status == RESERVED)
+        .values(stripe_session_id=session_data.id)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    if not saved:
+        try:
+            with track_external("stripe"):
+                stripe.checkout.Session.expire(session_data.id)
+        except stripe.error.StripeError:
+            pass  # unpaid either way; it expires on its own
+        return redirect(url_for("orders.checkout"))
+
+    return redirect(session_data.url, code=303)
+
+
+def _session_create_deadline():
+    # Longest a Session.create can take, retries included, plus some slack
+    config = current_app.config
+    return timedelta(seconds=config["STRIPE_TIMEOUT"] * (config["STRIPE_MAX_NETWORK_RETRIES"] + 1) + 30)
+
+
+def _resume_checkout(order):
+    # 🔁 Same cart again: send the buyer back to the session that is already open
+    if order.stripe_session_id is None:
+        if order.date and datetime.utcnow() - order.date < _session_create_deadline():
+            flash("⏳ Your checkout is already being prepared, please try again in a moment.")
+            return redirect(url_for("storefront.cart"))
+        # The request creating its session died before saving it: start over
+        release_reservation(order)
+        db.session.commit()
+        return redirect(url_for("orders.checkout"))
+    stripe = stripe_api()
+    try:
+        with track_external("stripe"):
+            checkout_session = stripe.checkout.Session.retrieve(order.stripe_session_id)
+    except stripe.error.StripeError:
+        flash("⚠️ We couldn't reach the payment provider. Please try again.")
+        return redirect(url_for("storefront.cart"))
+
+    if checkout_session.status == "open":
+        return redirect(checkout_session.url, code=303)
+    if checkout_session.status == "complete":
+        return redirect(url_for("orders.payment_success", session_id=order.stripe_session_id))
+    # Expired before its webhook got here: give the stock back and start over
+    release_reservation(order)
+    db.session.commit()
+    return redirect(url_for("orders.checkout"))
+
+
+@bp.route("/payment_success")
+@login_required
+def payment_success():
+    order = Order.query.filter_by(
+        stripe_session_id=request.args.get("session_id", ""), user_id=current_user.id
+    ).first_or_404()
+
+    # Ask Stripe rather than trusting the redirect; the webhook covers us if this fails
+    stripe = stripe_api()
+    try:
+        with track_external("stripe"):
+            checkout_session = stripe.checkout.Session.retrieve(order.stripe_session_id)
+        paid = checkout_session.payment_status == "paid"
+    except stripe.error.StripeError:
+        paid = False
+
+    paid_now = paid and mark_order_paid(order)
+    get_cart().clear()
+    db.session.commit()
+
+    if paid_now:
+        # Render the invoice on the background pool so the mail worker finds it cached
+        prerender_invoice(order)
+
+    if order.is_paid or paid:
+        flash("✅ Payment successful! Confirmation email (with invoice) is on its way.")
+    else:
+        flash("🕓 Payment received, we're confirming it with Stripe.")
+    return redirect(url_for("orders.orders"))
+
+
+@bp.route("/checkout/cancel/<int:order_id>")
+@login_required
+def checkout_cancel(order_id):
+    order = Order.query.filter_by(id=order_id, user_id=current_user.id).first_or_404()
+    if order.reservation_status == RESERVED and not order.is_paid:
+        # Expire the session first: once Stripe says it can't be paid any
+        # more, the stock can safely go back (the expiry webhook is then a no-op)
+        stripe = stripe_api()
+        try:
+            if order.stripe_session_id:
+                with track_external("stripe"):
+                    stripe.checkout.Session.expire(order.stripe_session_id)
+        except stripe.error.StripeError:
+            pass  # already completed or expired; the webhooks settle it
+        else:
+            release_reservation(order)
+            db.session.commit()
+    flash("Checkout cancelled. Your cart is still here.")
+    return redirect(url_for("storefront.cart"))
+
+
+@bp.route("/checkout/success/<int:order_id>")
+@login_required
+def checkout_success(order_id):
+    order = Order.query.filter_by(id=order_id, user_id=current_user.id).first_or_404()
+    return render_template("checkout_success.html", order=order)
+
+
+@bp.route("/stripe/webhook", methods=["POST"])
+def stripe_webhook():
+    payload = request.data
+    sig_header = request.headers.get("Stripe-Signature")
+    endpoint_secret = current_app.config["STRIPE_WEBHOOK_SECRET"]
+    stripe = stripe_api()
+
+    try:
+        event = stripe.Webhook.construct_event(payload, sig_header, endpoint_secret)
+    except ValueError:
+        return "Invalid payload", 400
+    except stripe.error.SignatureVerificationError:
+        return "Invalid signature", 400
+
+    # The signature checked out, so the payload is Stripe's; plain dicts from here
+    event = json.loads(payload)
+    if event["type"] in STRIPE_EVENT_HANDLERS:
+        # 📥 Stored before we answer: once Stripe has its 200 it never resends,
+        # so a worker dying after this point must not lose the payment
+        if store_stripe_event(event):
+            # ⚡ Applied on the background pool so Stripe never waits on it;
+            # `flask stripe-worker` picks up anything the pool doesn't finish
+            submit(process_stripe_event, event["id"])
+
+    return jsonify(success=True)
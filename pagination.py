@@ -0,0 +1,39 @@
+from collections import namedtuple
+
+from models import db
+
+# 📄 One page of keyset (seek) results plus the cursors around it
+Page = namedtuple("Page", ["items", "next_cursor", "prev_cursor"])
+
+
+def keyset_paginate(stmt, key, per_page, after=None, before=None, scalars=True):
+    """Seek through ``stmt`` by the unique, ascending ``key`` column.
+
+    Only ``per_page + 1`` rows are ever read, so the cost of a page does not
+    depend on how deep into the table it is or how big the table is.
+    ``after``/``before`` are the cursors handed out in a previous ``Page``.
+    """
+    if before is not None:
+        stmt = stmt.where(key < before).order_by(key.desc())
+    else:
+        if after is not None:
+            stmt = stmt.where(key > after)
+        stmt = stmt.order_by(key.asc())
+
+    result = db.session.execute(stmt.limit(per_page + 1))
+    rows = result.scalars().all() if scalars else result.all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if before is not None:
+        # We walked backwards, flip the rows back into ascending order
+        rows.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, after is not None
+
+    return Page(
+        items=rows,
+        next_cursor=getattr(rows[-1], key.key) if rows and has_next else None,
+        prev_cursor=getattr(rows[0], key.key) if rows and has_prev else None,
+    )
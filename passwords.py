@@ -0,0 +1,27 @@
+from functools import lru_cache
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# 🔑 Password hashing with the method/cost from PASSWORD_HASH_METHOD. Werkzeug
+# stores "method$salt$hash", so a hash made under older settings is easy to
+# spot and is replaced the next time its owner logs in.
+
+
+def hash_password(password):
+    return generate_password_hash(password, method=current_app.config["PASSWORD_HASH_METHOD"])
+
+
+def verify_password(stored_hash, password):
+    return check_password_hash(stored_hash, password)
+
+
+@lru_cache(maxsize=None)
+def _full_method(method):
+    # "scrypt" -> "scrypt:32768:8:1": let Werkzeug fill in its defaults once
+    return generate_password_hash("", method=method).split("$", 1)[0]
+
+
+def needs_rehash(stored_hash):
+    """True if ``stored_hash`` was made with a different method or cost than configured."""
+    return stored_hash.split("$", 1)[0] != _full_method(current_app.config["PASSWORD_HASH_METHOD"])
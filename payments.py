@@ -0,0 +1,243 @@
+import hashlib
+import logging
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app, render_template
+from flask.cli import with_appcontext
+from sqlalchemy.exc import IntegrityError
+
+from inventory import RESERVED, OutOfStock, confirm_reservation, release_reservation, reserve_stock
+from invoices import prerender_invoice
+from mailer import enqueue_email
+from models import db, DailySales, Order, OrderItem, StripeEvent
+
+logger = logging.getLogger(__name__)
+
+_stripe = None
+
+
+def stripe_api():
+    """The ``stripe`` module, imported and configured on first use.
+
+    Worker start-up and CLI commands like ``flask db upgrade`` never talk
+    to Stripe, so they don't pay for importing the SDK.
+    """
+    global _stripe
+    if _stripe is None:
+        import stripe
+
+        config = current_app.config
+        stripe.api_key = config["STRIPE_SECRET_KEY"]
+        # ⏱️ Bound how long a checkout can wait on Stripe (requests cooperates under gevent)
+        stripe.default_http_client = stripe.RequestsClient(timeout=config["STRIPE_TIMEOUT"])
+        stripe.max_network_retries = config["STRIPE_MAX_NETWORK_RETRIES"]
+        if config["STRIPE_API_BASE"]:
+            stripe.api_base = config["STRIPE_API_BASE"]  # e.g. a local stub for load tests
+        _stripe = stripe
+    return _stripe
+
+
+def checkout_key(user_id, items):
+    """Idempotency key for an open checkout: same buyer, lines and prices, same key."""
+    lines = sorted((item["id"], item["quantity"], item["price"]) for item in items)
+    return hashlib.sha256(repr((user_id, lines)).encode()).hexdigest()
+
+
+def create_pending_order(user_id, items, total, key):
+    """Insert an unpaid order, all its items and its stock reservation in one transaction.
+
+    Returns ``(order, True)``. If an open checkout already holds ``key`` (a
+    reload, a double click, a concurrent request) nothing is written and
+    that order comes back as ``(order, False)``. Raises ``OutOfStock``
+    after rolling back.
+    """
+    existing = Order.query.filter_by(checkout_key=key).first()
+    if existing is not None:
+        return existing, False
+
+    order = Order(user_id=user_id, total=total, is_paid=False, reservation_status=RESERVED, checkout_key=key)
+    db.session.add(order)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        # A concurrent request with the same cart committed first; nothing
+        # of ours is written yet, so a plain rollback is enough
+        db.session.rollback()
+        return Order.query.filter_by(checkout_key=key).one(), False
+
+    # One executemany for every line instead of an ORM flush per item
+    db.session.execute(
+        db.insert(OrderItem),
+        [
+            {
+                "order_id": order.id,
+                "product_id": item["id"],
+                "product_name": item["name"],
+                "quantity": item["quantity"],
+                "price": item["price"],
+            }
+            for item in items
+        ],
+    )
+    try:
+        reserve_stock(items)
+    except OutOfStock:
+        db.session.rollback()
+        raise
+    db.session.commit()
+    return order, True
+
+
+def mark_order_paid(order):
+    """Flip ``order`` to paid exactly once, in the caller's transaction.
+
+    The conditional UPDATE makes the browser redirect and the webhook safe
+    to race: only the one that flips the flag confirms the stock
+    reservation, records the sale and queues the confirmation email. Needs
+    a request context for the email's URLs. Returns False if the order was
+    already paid; on True the caller should ``prerender_invoice(order)``
+    once it has committed.
+    """
+    flipped = db.session.execute(
+        db.update(Order)
+        .where(Order.id == order.id, Order.is_paid.is_(False))
+        .values(is_paid=True)
+    ).rowcount
+    if not flipped:
+        return False
+
+    confirm_reservation(order)
+    DailySales.record(order)
+    enqueue_email(
+        order.user.email,
+        f"🧾 Your Flask Shop Order #{order.id} Confirmation",
+        render_template("email_order_success.html", order=order),
+        invoice_order_id=order.id,
+    )
+    return True
+
+
+def store_stripe_event(event):
+    """Put a verified webhook ``event`` (the parsed JSON) in the inbox and commit.
+
+    Returns False, writing nothing, if it was already stored: Stripe
+    redelivers until it gets a 2xx, so it may send the same event again.
+    """
+    checkout_session = event["data"]["object"]
+    db.session.add(StripeEvent(
+        id=event["id"],
+        type=event["type"],
+        session_id=checkout_session.get("id"),
+        payment_status=checkout_session.get("payment_status"),
+    ))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return False
+    return True
+
+
+def _apply_checkout_completed(event):
+    order = Order.query.filter_by(stripe_session_id=event.session_id).first()
+    if order is None:
+        # checkout() saves the session id after Stripe answers; the webhook can beat it
+        raise LookupError(f"no order for checkout session {event.session_id}")
+
+    # No request here; emails and the invoice link to SHOP_BASE_URL, as in the mail worker
+    with current_app.test_request_context(base_url=current_app.config["SHOP_BASE_URL"]):
+        paid_now = event.payment_status == "paid" and mark_order_paid(order)
+        db.session.commit()
+        if paid_now:
+            logger.info("✅ Order #%s marked as PAID via webhook", order.id)
+            prerender_invoice(order)
+
+
+def _apply_checkout_expired(event):
+    # The session can no longer be paid, so the order's stock goes back
+    order = Order.query.filter_by(stripe_session_id=event.session_id).first()
+    if order is not None and not order.is_paid and release_reservation(order):
+        logger.info("📦 Released stock for expired order #%s", order.id)
+    db.session.commit()
+
+
+STRIPE_EVENT_HANDLERS = {
+    "checkout.session.completed": _apply_checkout_completed,
+    "checkout.session.expired": _apply_checkout_expired,
+}
+
+
+def _schedule_retry(event_id, error):
+    event = db.session.get(StripeEvent, event_id)
+    event.attempts += 1
+    event.last_error = repr(error)
+    if event.attempts >= current_app.config["STRIPE_EVENT_MAX_ATTEMPTS"]:
+        event.status = "failed"
+        logger.error("Giving up on Stripe event %s: %r", event_id, error)
+    else:
+        delay = current_app.config["STRIPE_EVENT_RETRY_BASE_SECONDS"] * 2 ** (event.attempts - 1)
+        event.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+        logger.warning("Stripe event %s failed (attempt %s), retrying in %ss: %r", event_id, event.attempts, delay, error)
+    db.session.commit()
+
+
+def process_stripe_event(event_id):
+    """Apply one stored event; returns True if this call applied it.
+
+    Claiming the row (pending -> processed) happens in the same transaction
+    as the state change, so the background pool and the worker can both try
+    an event and only one of them applies it. A failure rolls both back and
+    schedules a retry.
+    """
+    claimed = db.session.execute(
+        db.update(StripeEvent)
+        .where(StripeEvent.id == event_id, StripeEvent.status == "pending")
+        .values(status="processed", processed_at=datetime.utcnow())
+    ).rowcount
+    if not claimed:
+        db.session.rollback()
+        return False
+
+    event = db.session.get(StripeEvent, event_id)
+    try:
+        STRIPE_EVENT_HANDLERS[event.type](event)  # commits
+    except Exception as e:
+        db.session.rollback()
+        _schedule_retry(event_id, e)
+        return False
+    return True
+
+
+def drain_stripe_events(batch_size=50):
+    """Apply stored events that are due; returns how many were attempted.
+
+    Picks up whatever the background pool didn't finish: a worker that
+    died after acknowledging the webhook, or events waiting on a retry.
+    """
+    event_ids = db.session.scalars(
+        db.select(StripeEvent.id)
+        .where(StripeEvent.status == "pending", StripeEvent.next_attempt_at <= datetime.utcnow())
+        .order_by(StripeEvent.received_at)
+        .limit(batch_size)
+    ).all()
+    db.session.rollback()  # end the read; each event gets its own transaction
+    for event_id in event_ids:
+        process_stripe_event(event_id)
+    return len(event_ids)
+
+
+@click.command("stripe-worker")
+@click.option("--interval", default=5.0, show_default=True, help="Seconds to sleep when nothing is due.")
+@click.option("--once", is_flag=True, help="Apply everything that is due, then exit.")
+@with_appcontext
+def stripe_worker_command(interval, once):
+    """Apply stored Stripe webhook events the web workers didn't get to."""
+    click.echo("📥 Stripe event worker started")
+    while True:
+        if drain_stripe_events():
+            continue
+        if once:
+            break
+        time.sleep(interval)
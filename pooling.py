@@ -0,0 +1,79 @@
+import logging
+import os
+import time
+
+from sqlalchemy.pool import NullPool, QueuePool
+
+from metrics import DB_POOL_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+POOL_WAIT_LOG_MS = float(os.getenv("DB_POOL_WAIT_LOG_MS", 50))
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            DB_POOL_WAIT_SECONDS.observe(waited)
+            if waited * 1000 >= POOL_WAIT_LOG_MS:
+                logger.warning(
+                    "⏳ Waited %.1f ms for a DB connection (pool size %s, checked out %s, overflow %s)",
+                    waited * 1000, self.size(), self.checkedout(), self.overflow(),
+                )
+
+
+def _worker_pool_size():
+    """Default (pool_size, max_overflow) for one gunicorn worker process.
+
+    Mirrors the worker model from gunicorn.conf.py: a sync worker serves one
+    request at a time, gthread serves GUNICORN_THREADS, and gevent can run
+    hundreds of greenlets, so it gets a capped pool plus overflow instead of
+    one connection per greenlet. BACKGROUND_WORKERS threads also hold
+    connections while they pre-render invoices.
+    """
+    worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+    threads = int(os.getenv("GUNICORN_THREADS", 1))
+    background = int(os.getenv("BACKGROUND_WORKERS", 2))
+
+    if worker_class == "gevent":
+        return 10, 20
+    if worker_class == "gthread" or threads > 1:  # gunicorn switches sync to gthread when threads > 1
+        return threads + background, max(2, threads // 2)
+    return 1 + background, 2
+
+
+def engine_options(db_url):
+    """SQLALCHEMY_ENGINE_OPTIONS for ``db_url``.
+
+    DB_POOL_MODE=transaction is for running behind a transaction-level
+    pooler such as PgBouncer: the pooler owns the connections, so the app
+    opens one per checkout (NullPool) and never relies on prepared
+    statements surviving between transactions.
+    """
+    if not db_url.startswith("postgresql"):
+        return {}
+
+    if os.getenv("DB_POOL_MODE", "session") == "transaction":
+        options = {"poolclass": NullPool}
+        if db_url.startswith("postgresql+psycopg://"):
+            # psycopg 3 prepares repeated statements server-side by default
+            options["connect_args"] = {"prepare_threshold": None}
+        return options
+
+    pool_size, max_overflow = _worker_pool_size()
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", pool_size)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", max_overflow)),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+        # Recycle before Postgres/proxies drop idle connections, and test each
+        # checkout so a database restart doesn't surface as request errors
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "True") == "True",
+    }
@@ -0,0 +1,149 @@
+import re
+from collections import namedtuple
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import DDL, event
+
+from models import db, Product
+
+# 🔎 Full-text product search over name + description.
+#   SQLite:     the product_fts FTS5 table; rowid = product.id, kept in sync
+#               by index_product()/remove_product() from the admin routes
+#   PostgreSQL: product.search_vector, a generated tsvector column with a
+#               GIN index; the database keeps it in sync itself
+# Both are created by the c7e4a9f2b318 migration, and by db.create_all()
+# through the DDL hooks below (benchmarks, tests, local dev).
+NAME_WEIGHT, DESCRIPTION_WEIGHT = 10.0, 1.0
+
+for ddl in (
+    DDL(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS product_fts USING fts5("
+        "name, description, tokenize = 'porter unicode61', prefix = '2 3')"
+    ).execute_if(dialect="sqlite"),
+    DDL(
+        "ALTER TABLE product ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+        ") STORED"
+    ).execute_if(dialect="postgresql"),
+    DDL(
+        "CREATE INDEX ix_product_search_vector ON product USING gin (search_vector)"
+    ).execute_if(dialect="postgresql"),
+):
+    event.listen(Product.__table__, "after_create", ddl)
+event.listen(
+    Product.__table__, "before_drop", DDL("DROP TABLE IF EXISTS product_fts").execute_if(dialect="sqlite")
+)
+
+SearchPage = namedtuple("SearchPage", ["items", "page", "has_next"])
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _dialect():
+    return db.engine.dialect.name
+
+
+def _tokens(query):
+    return _TOKEN.findall(query.lower())[:10]
+
+
+def index_product(product):
+    """Add or refresh ``product`` in the search index, in the caller's transaction."""
+    if _dialect() != "sqlite":
+        return
+    if product.id is None:
+        db.session.flush()
+    db.session.execute(
+        db.text("DELETE FROM product_fts WHERE rowid = :id"), {"id": product.id}
+    )
+    db.session.execute(
+        db.text("INSERT INTO product_fts (rowid, name, description) VALUES (:id, :name, :description)"),
+        {"id": product.id, "name": product.name, "description": product.description or ""},
+    )
+
+
+def remove_product(product_id):
+    if _dialect() != "sqlite":
+        return
+    db.session.execute(db.text("DELETE FROM product_fts WHERE rowid = :id"), {"id": product_id})
+
+
+def rebuild_index():
+    """Re-index every product (after bulk loads that bypass the routes)."""
+    if _dialect() != "sqlite":
+        return
+    db.session.execute(db.text("DELETE FROM product_fts"))
+    db.session.execute(db.text(
+        "INSERT INTO product_fts (rowid, name, description) "
+        "SELECT id, name, coalesce(description, '') FROM product"
+    ))
+    db.session.commit()
+
+
+def _sqlite_statement(tokens):
+    # Every term must match; each is a quoted prefix query, so user input
+    # can't inject FTS5 syntax ("wid" finds "widget")
+    match = " ".join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+    # Rank and cut the page inside FTS5, then join only those rows
+    return db.text(
+        "SELECT product.* FROM ("
+        f"SELECT rowid, bm25(product_fts, {NAME_WEIGHT}, {DESCRIPTION_WEIGHT}) AS score "
+        "FROM product_fts WHERE product_fts MATCH :match "
+        "ORDER BY score, rowid LIMIT :limit OFFSET :offset"
+        ") AS hit JOIN product ON product.id = hit.rowid "
+        "ORDER BY hit.score, hit.rowid"
+    ).bindparams(match=match)
+
+
+def _postgresql_statement(tokens):
+    tsquery = " & ".join(f"{token}:*" for token in tokens)
+    return db.text(
+        "SELECT product.* FROM product, to_tsquery('english', :tsquery) AS query "
+        "WHERE product.search_vector @@ query "
+        "ORDER BY ts_rank(product.search_vector, query) DESC, product.id "
+        "LIMIT :limit OFFSET :offset"
+    ).bindparams(tsquery=tsquery)
+
+
+def _like_statement(tokens):
+    # Any other database: unranked substring scan
+    stmt = db.select(Product)
+    for token in tokens:
+        pattern = f"%{token}%"
+        stmt = stmt.where(db.or_(Product.name.ilike(pattern), Product.description.ilike(pattern)))
+    return stmt.order_by(Product.id)
+
+
+def search_products(query, page=1, per_page=24):
+    """Best matches for ``query`` first, one page at a time.
+
+    Ranked results have no stable unique sort key, so this pages by offset;
+    ``SEARCH_MAX_PAGES`` bounds how deep that can go.
+    """
+    tokens = _tokens(query)
+    page = max(1, min(page, current_app.config["SEARCH_MAX_PAGES"]))
+    if not tokens:
+        return SearchPage(items=[], page=page, has_next=False)
+
+    limit, offset = per_page + 1, (page - 1) * per_page
+    dialect = _dialect()
+    if dialect in ("sqlite", "postgresql"):
+        statement = (_sqlite_statement if dialect == "sqlite" else _postgresql_statement)(tokens)
+        stmt = db.select(Product).from_statement(statement.bindparams(limit=limit, offset=offset))
+    else:
+        stmt = _like_statement(tokens).limit(limit).offset(offset)
+
+    items = db.session.execute(stmt).scalars().all()
+    has_next = len(items) > per_page and page < current_app.config["SEARCH_MAX_PAGES"]
+    return SearchPage(items=items[:per_page], page=page, has_next=has_next)
+
+
+@click.command("search-reindex")
+@with_appcontext
+def search_reindex_command():
+    """Rebuild the SQLite FTS5 product index."""
+    rebuild_index()
+    click.echo("✅ Search index rebuilt")
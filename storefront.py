@@ -0,0 +1,103 @@
+from flask import Blueprint, current_app, flash, redirect, render_template, request, url_for
+from flask_login import current_user, login_required
+from markupsafe import Markup
+
+from cart_store import get_cart
+from conditional import conditional, page_etag, release_digest
+from fragment_cache import cached_fragment
+from models import db, CatalogVersion, Product
+from pagination import keyset_paginate
+from search import search_products
+
+# 🛍️ Catalog, search and the cart
+bp = Blueprint("storefront", __name__)
+
+
+@bp.route("/")
+def index():
+  after = request.args.get("after", type=int)
+  before = request.args.get("before", type=int)
+
+  # 🔁 Validators first: an unchanged catalog answers 304 without rendering
+  version, latest = CatalogVersion.validators()
+
+  def render_grid():
+    # 📄 Keyset pagination: page 1 costs the same with 100 or 500k products
+    page = keyset_paginate(
+        db.select(Product),
+        Product.id,
+        per_page=current_app.config["PRODUCTS_PER_PAGE"],
+        after=after,
+        before=before,
+    )
+    return render_template("_product_grid.html", products=page.items, page=page)
+
+  def render():
+    # 🧊 The grid is identical for every guest (and every customer); any
+    # catalog write bumps the version, so stale grids are never looked up
+    key = f"{release_digest()}:{version}:{after}:{before}:{current_user.is_authenticated}"
+    grid = cached_fragment("product_grid", key, render_grid)
+    return render_template("index.html", grid=Markup(grid))
+
+  return conditional(page_etag("catalog", version, latest, after, before), None, render)
+
+
+@bp.route("/search")
+def search():
+    query = request.args.get("q", "").strip()
+    results = search_products(
+        query,
+        page=request.args.get("page", 1, type=int),
+        per_page=current_app.config["PRODUCTS_PER_PAGE"],
+    )
+    return render_template("search.html", query=query, results=results, products=results.items)
+
+
+# 🛒 Add item to cart
+@bp.route("/add_to_cart/<int:product_id>")
+@login_required
+def add_to_cart(product_id):
+    product = Product.query.get_or_404(product_id)
+    get_cart().add(product)
+    db.session.commit()
+    flash(f"🛒 Added {product.name} to your cart.")
+    return redirect(url_for("storefront.index"))
+
+
+# 🧾 View cart
+@bp.route("/cart")
+@login_required
+def cart():
+    # 🧹 Validate and price every line with one query; products that no longer exist are dropped
+    items, total = get_cart().priced()
+    db.session.commit()
+    return render_template("cart.html", cart=items, total=total)
+
+
+# ❌ Remove item from cart
+@bp.route("/remove_from_cart/<int:product_id>")
+@login_required
+def remove_from_cart(product_id):
+  get_cart().remove(product_id)
+  db.session.commit()
+  flash("Item removed from your cart.")
+  return redirect(url_for("storefront.cart"))
+
+
+@bp.route("/clear_cart")
+@login_required
+def clear_cart():
+    get_cart().clear()
+    db.session.commit()
+    flash("🧹 Cart cleared successfully.")
+    return redirect(url_for("storefront.index"))
+
+
+@bp.route("/health")
+def health():
+    return {"status": "ok", "message": "Flask app is running fine!"}, 200
+
+
+@bp.route("/ping")
+def ping():
+    return "pong", 200
@@ -1,6 +1,10 @@
-from app import mail, Message, app
+from flask_mail import Message
+
+from app import create_app, mail
 from models import Order, User
 
+app = create_app()
+
 with app.app_context():
     order = Order.query.first()
     user = User.query.get(order.user_id)
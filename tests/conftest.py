@@ -0,0 +1,85 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+# Config reads DATABASE_URL at import time; never let tests near instance/shop.db
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'tests.db')}")
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+from app import create_app  # noqa: E402
+from config import Config  # noqa: E402
+from models import db, Product, User  # noqa: E402
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Build an app on a fresh SQLite file; keyword arguments override config."""
+    apps = []
+
+    def make(**overrides):
+        settings = dict(
+            TESTING=True,
+            SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'shop.db'}",
+            SQLALCHEMY_ENGINE_OPTIONS={},
+            PASSWORD_HASH_METHOD="pbkdf2:sha256:1000",  # tests don't need slow hashes
+            USER_CACHE_TTL=0,  # module-level caches would outlive each test's database
+            FRAGMENT_CACHE_BACKEND="none",
+            INVOICE_CACHE_DIR=str(tmp_path / "invoices"),
+            MAIL_SUPPRESS_SEND=False,
+        )
+        settings.update(overrides)
+        app = create_app(type("TestConfig", (Config,), settings))
+        with app.app_context():
+            db.create_all()
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+            db.engine.dispose()
+
+
+@pytest.fixture
+def app(make_app):
+    # No app context is left pushed: a request would reuse it, sharing ``g``
+    # and the DB session with the test. Set up data inside app.app_context().
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def add_user(username="ann", is_admin=False, password="secret"):
+    user = User(
+        username=username,
+        email=f"{username}@example.com",
+        password=generate_password_hash(password, "pbkdf2:sha256:1000"),
+        is_admin=is_admin,
+    )
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def add_product(name="Widget", price=9.99, stock=10):
+    product = Product(name=name, price=price, description="", stock=stock)
+    db.session.add(product)
+    db.session.commit()
+    return product
+
+
+def log_in(client, user_id):
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user_id)
+    return client
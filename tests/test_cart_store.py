@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import event
+
+from cart_store import BaseCart, DatabaseCart
+from conftest import add_product, add_user
+from models import db, Cart, CartItem
+
+
+def race_insert(table, **values):
+    """Insert a row into ``table`` just before our own write to it, as if another request got there first.
+
+    It lands ahead of the savepoint guarding that write, so the savepoint's
+    rollback can't undo it.
+    """
+    columns = ", ".join(values)
+    sql = f"INSERT INTO {table} ({columns}) VALUES ({', '.join(':' + c for c in values)})"
+    fired = []
+
+    def race(conn, cursor, statement, parameters, context, executemany):
+        if not fired and (statement.startswith("SAVEPOINT") or statement.startswith(f"INSERT INTO {table} ")):
+            fired.append(statement)
+            cursor.execute(sql, values)
+
+    event.listen(db.engine, "before_cursor_execute", race)
+    return fired
+
+
+def test_base_cart_is_abstract():
+    with pytest.raises(TypeError):
+        BaseCart()
+
+
+def test_concurrent_cart_creation(app):
+    with app.app_context():
+        user = add_user()
+        product = add_product()
+        race_insert("cart", user_id=user.id)
+
+        DatabaseCart(user.id).add(product)
+        db.session.commit()
+
+        assert db.session.query(Cart).filter_by(user_id=user.id).count() == 1
+        assert DatabaseCart(user.id).quantities() == {product.id: 1}
+
+
+def test_concurrent_first_add_of_a_product(app):
+    with app.app_context():
+        user = add_user()
+        product = add_product()
+        cart = Cart(user_id=user.id)
+        db.session.add(cart)
+        db.session.commit()
+        race_insert("cart_item", cart_id=cart.id, product_id=product.id, quantity=1)
+
+        DatabaseCart(user.id).add(product)
+        db.session.commit()
+
+        assert db.session.query(CartItem).count() == 1
+        assert DatabaseCart(user.id).quantities() == {product.id: 2}
@@ -0,0 +1,166 @@
+from datetime import datetime, timedelta
+from itertools import count
+from types import SimpleNamespace
+
+import pytest
+
+import orders
+from conftest import add_product, add_user, log_in
+from inventory import RELEASED, RESERVED
+from models import db, Order, Product
+
+
+class StripeError(Exception):
+    pass
+
+
+class FakeSessions:
+    """Just enough of stripe.checkout.Session for checkout()."""
+
+    def __init__(self):
+        self.ids = count(1)
+        self.fail_with = None
+        self.expired = []
+
+    def create(self, **params):
+        if self.fail_with:
+            raise self.fail_with
+        session_id = f"cs_test_{next(self.ids)}"
+        return SimpleNamespace(id=session_id, url=f"https://checkout.stripe.test/{session_id}")
+
+    def retrieve(self, session_id):
+        return SimpleNamespace(id=session_id, status="open", url=f"https://checkout.stripe.test/{session_id}")
+
+    def expire(self, session_id):
+        self.expired.append(session_id)
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    sessions = FakeSessions()
+    fake = SimpleNamespace(checkout=SimpleNamespace(Session=sessions), error=SimpleNamespace(StripeError=StripeError))
+    monkeypatch.setattr(orders, "stripe_api", lambda: fake)
+    return sessions
+
+
+@pytest.fixture
+def product_id(app, client):
+    with app.app_context():
+        log_in(client, add_user().id)
+        product_id = add_product(stock=5).id
+    client.get(f"/add_to_cart/{product_id}")
+    return product_id
+
+
+def only_order():
+    db.session.expire_all()
+    return db.session.query(Order).one()
+
+
+def stock(product_id):
+    db.session.expire_all()
+    return db.session.get(Product, product_id).stock
+
+
+def test_checkout_redirects_to_stripe_and_holds_stock(app, client, sessions, product_id):
+    response = client.get("/checkout")
+
+    assert response.status_code == 303
+    assert response.location == "https://checkout.stripe.test/cs_test_1"
+    with app.app_context():
+        assert only_order().stripe_session_id == "cs_test_1"
+        assert stock(product_id) == 4
+    # A reload resumes the same session
+    assert client.get("/checkout").location == "https://checkout.stripe.test/cs_test_1"
+
+
+@pytest.mark.parametrize("error", [StripeError("down"), RuntimeError("bug")])
+def test_failed_session_create_releases_the_stock(app, client, sessions, product_id, error):
+    sessions.fail_with = error
+    if isinstance(error, StripeError):
+        assert client.get("/checkout").status_code == 302
+    else:
+        with pytest.raises(RuntimeError):
+            client.get("/checkout")
+
+    with app.app_context():
+        assert only_order().reservation_status == RELEASED
+        assert stock(product_id) == 5
+
+    sessions.fail_with = None
+    assert client.get("/checkout").status_code == 303
+
+
+def abandon_checkout(app, minutes_ago):
+    # The worker died between committing the order and saving its session id
+    with app.app_context():
+        order = only_order()
+        order.stripe_session_id = None
+        order.date = datetime.utcnow() - timedelta(minutes=minutes_ago)
+        db.session.commit()
+
+
+def test_recent_order_without_session_is_left_alone(app, client, sessions, product_id):
+    client.get("/checkout")
+    abandon_checkout(app, minutes_ago=0)
+
+    response = client.get("/checkout")
+
+    assert response.location.endswith("/cart")
+    with app.app_context():
+        assert only_order().reservation_status == RESERVED
+        assert stock(product_id) == 4
+
+
+def test_abandoned_order_without_session_is_released(app, client, sessions, product_id):
+    client.get("/checkout")
+    abandon_checkout(app, minutes_ago=10)
+
+    response = client.get("/checkout")
+    assert response.location.endswith("/checkout")
+    with app.app_context():
+        assert only_order().reservation_status == RELEASED
+        assert stock(product_id) == 5
+
+    assert client.get("/checkout").location == "https://checkout.stripe.test/cs_test_2"
+    with app.app_context():
+        assert stock(product_id) == 4
+
+
+def test_session_created_after_release_is_expired(app, client, sessions, product_id, monkeypatch):
+    create = sessions.create
+
+    def slow_create(**params):
+        # While Stripe was answering, a reload released the order as abandoned
+        with app.app_context():
+            order = only_order()
+            order.reservation_status = RELEASED
+            order.checkout_key = None
+            db.session.commit()
+        return create(**params)
+
+    monkeypatch.setattr(sessions, "create", slow_create)
+    response = client.get("/checkout")
+
+    assert response.location.endswith("/checkout")
+    assert sessions.expired == ["cs_test_1"]
+    with app.app_context():
+        assert only_order().stripe_session_id is None
+
+
+def test_cancelled_checkout_is_not_an_order(app, client, sessions, product_id):
+    client.get("/checkout")
+    with app.app_context():
+        order_id = only_order().id
+        admin_id = add_user("admin", is_admin=True).id
+
+    client.get(f"/checkout/cancel/{order_id}")
+
+    with app.app_context():
+        assert only_order().reservation_status == RELEASED
+    assert f"<td>{order_id}</td>" not in client.get("/orders").get_data(as_text=True)
+    assert client.get(f"/order/{order_id}").status_code == 404
+    assert client.get(f"/order/{order_id}/invoice").status_code == 404
+    assert "❌" not in client.get("/dashboard").get_data(as_text=True)
+    log_in(client, admin_id)
+    assert f"<td>{order_id}</td>" not in client.get("/admin/orders").get_data(as_text=True)
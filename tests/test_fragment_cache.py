@@ -0,0 +1,27 @@
+import os
+
+from fragment_cache import FileCache
+
+
+def test_file_cache_is_capped_like_the_lru(tmp_path, monkeypatch):
+    monkeypatch.setattr(FileCache, "PRUNE_EVERY", 5)
+    cache = FileCache(str(tmp_path), maxsize=3, ttl=300)
+
+    # A crawler walking random cursors: every key is new
+    for cursor in range(1, 21):
+        cache.set(f"product_grid:v1:{cursor}:None:False", f"<grid {cursor}>")
+
+    assert len(cache) == 3
+    assert cache.get("product_grid:v1:20:None:False") == "<grid 20>"
+
+
+def test_prune_drops_the_oldest_entries_first(tmp_path):
+    cache = FileCache(str(tmp_path), maxsize=2, ttl=300)
+    for age, key in enumerate(["newest", "middle", "oldest"]):
+        cache.set(key, key)
+        mtime = os.path.getmtime(cache._path(key)) - age
+        os.utime(cache._path(key), (mtime, mtime))
+
+    cache.prune()
+
+    assert (cache.get("newest"), cache.get("middle"), cache.get("oldest")) == ("newest", "middle", None)
@@ -0,0 +1,48 @@
+import io
+
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+import images
+from images import image_srcset, save_image
+
+
+@pytest.fixture
+def app(make_app, tmp_path):
+    app = make_app(PRODUCT_UPLOAD_FOLDER=str(tmp_path / "static" / "uploads" / "products"))
+    app.static_folder = str(tmp_path / "static")
+    return app
+
+
+def upload(width, height):
+    data = io.BytesIO()
+    Image.new("RGB", (width, height), "red").save(data, "PNG")
+    data.seek(0)
+    return FileStorage(stream=data, filename="upload.png")
+
+
+def srcset_widths(path):
+    return [candidate.rsplit(" ", 1)[1] for candidate in image_srcset(path).split(", ")]
+
+
+def test_large_upload_offers_every_variant(app):
+    with app.test_request_context():
+        path = "uploads/products/" + save_image(upload(2000, 1000), "PRODUCT_UPLOAD_FOLDER")
+        assert srcset_widths(path) == ["160w", "480w", "1200w"]
+
+
+def test_small_upload_only_advertises_its_real_width(app):
+    with app.test_request_context():
+        path = "uploads/products/" + save_image(upload(300, 200), "PRODUCT_UPLOAD_FOLDER")
+        # card and full are both the untouched 300px image: one candidate, at its true width
+        assert srcset_widths(path) == ["160w", "300w"]
+        assert "-card.webp 300w" in image_srcset(path)
+
+
+def test_uploads_without_a_manifest_read_the_files(app, tmp_path):
+    with app.test_request_context():
+        digest = save_image(upload(300, 200), "PRODUCT_UPLOAD_FOLDER")
+        (tmp_path / "static" / "uploads" / "products" / f"{digest}.json").unlink()
+        images._widths.clear()
+        assert srcset_widths("uploads/products/" + digest) == ["160w", "300w"]
@@ -0,0 +1,21 @@
+import logging
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from models import db
+
+
+def test_failed_statements_leave_nothing_on_the_connection(make_app, caplog):
+    app = make_app(SLOW_QUERY_THRESHOLD_MS=1000)
+    with app.app_context():
+        connection = db.session.connection()
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                connection.execute(db.text("SELECT * FROM no_such_table"))
+        assert connection.info == {}
+
+        with caplog.at_level(logging.WARNING, logger="instrumentation"):
+            connection.execute(db.text("SELECT 1"))
+
+    assert "Slow query" not in caplog.text
@@ -0,0 +1,135 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import add_product, add_user, log_in
+from inventory import CONFIRMED, RELEASED, OutOfStock, confirm_reservation, release_reservation
+from models import db, Order, Product
+from payments import checkout_key, create_pending_order
+
+
+def line(product_id, quantity=1):
+    return {"id": product_id, "name": "Widget", "price": 9.99, "quantity": quantity}
+
+
+def stock(product_id):
+    db.session.expire_all()
+    return db.session.get(Product, product_id).stock
+
+
+@pytest.mark.parametrize("buyers, units", [(20, 5), (8, 8)])
+def test_concurrent_checkouts_never_oversell(app, buyers, units):
+    with app.app_context():
+        product_id = add_product(stock=units).id
+        user_ids = [add_user(f"buyer{i}").id for i in range(buyers)]
+    start_line = threading.Barrier(buyers)
+
+    def buy(user_id):
+        with app.app_context():
+            items = [line(product_id)]
+            start_line.wait()
+            try:
+                create_pending_order(user_id, items, 9.99, checkout_key(user_id, items))
+            except OutOfStock:
+                return "sold out"
+            return "reserved"
+
+    with ThreadPoolExecutor(buyers) as pool:
+        outcomes = list(pool.map(buy, user_ids))
+
+    assert outcomes.count("reserved") == units
+    with app.app_context():
+        assert stock(product_id) == 0
+        assert db.session.query(Order).count() == units
+
+
+def test_release_returns_stock_once(app):
+    with app.app_context():
+        user_id = add_user().id
+        product_id = add_product(stock=3).id
+        order, _ = create_pending_order(user_id, [line(product_id, 2)], 19.98, "key")
+        assert stock(product_id) == 1
+
+        assert release_reservation(order)
+        assert not release_reservation(order)
+        db.session.commit()
+
+        assert stock(product_id) == 3
+        assert order.reservation_status == RELEASED
+
+
+def test_paid_after_release_takes_stock_back_without_going_negative(app, caplog):
+    with app.app_context():
+        user_id = add_user().id
+        product_id = add_product(stock=2).id
+        order, _ = create_pending_order(user_id, [line(product_id, 2)], 19.98, "key")
+        release_reservation(order)
+        db.session.commit()
+        # Meanwhile someone else bought one of the returned units
+        db.session.get(Product, product_id).stock = 1
+        db.session.commit()
+
+        with caplog.at_level(logging.ERROR, logger="inventory"):
+            confirm_reservation(order)
+            db.session.commit()
+
+        assert stock(product_id) == 0
+        assert order.reservation_status == CONFIRMED
+        assert "Oversold" in caplog.text
+
+
+@pytest.mark.parametrize("as_admin", [None, False])
+def test_update_stock_requires_an_admin(app, client, as_admin):
+    with app.app_context():
+        product_id = add_product(stock=5).id
+        if as_admin is not None:
+            log_in(client, add_user(is_admin=as_admin).id)
+
+    client.post(f"/update_stock/{product_id}", data={"stock": "0"})
+
+    with app.app_context():
+        assert stock(product_id) == 5
+
+
+def test_admin_sets_stock_when_adding_and_editing(app, client):
+    with app.app_context():
+        log_in(client, add_user(is_admin=True).id)
+
+    client.post("/admin/add_product", data={"name": "Widget", "price": "9.99", "description": "", "stock": "7"})
+    client.post("/admin/add_product", data={"name": "Poster", "price": "5", "description": "", "stock": ""})
+    with app.app_context():
+        widget, poster = Product.query.order_by(Product.id).all()
+        assert (widget.stock, poster.stock) == (7, None)  # blank: not tracked, never sold out
+        widget_id = widget.id
+
+    client.post(f"/admin/edit_product/{widget_id}", data={"name": "Widget", "price": "9.99", "description": "", "stock": "3"})
+    client.post(f"/update_stock/{widget_id}", data={"stock": "4"})
+    client.post(f"/update_stock/{widget_id}", data={"stock": "-1"})
+    with app.app_context():
+        assert stock(widget_id) == 4
+
+    page = client.get("/admin/products").get_data(as_text=True)
+    assert f'action="/update_stock/{widget_id}"' in page
+
+
+def test_admin_stock_excludes_units_held_by_open_checkouts(app, client):
+    with app.app_context():
+        log_in(client, add_user("admin", is_admin=True).id)
+        buyer_id = add_user().id
+        product_id = add_product(stock=10).id
+        order, _ = create_pending_order(buyer_id, [line(product_id, 3)], 29.97, "key")
+        order_id = order.id
+
+    # The admin pages show the hold next to the figure being edited
+    assert "+3 held by open checkouts" in client.get("/admin/products").get_data(as_text=True)
+    assert "(3 right now)" in client.get(f"/admin/edit_product/{product_id}").get_data(as_text=True)
+
+    # 5 free to sell, with 3 more held: abandoning the checkout brings 8
+    client.post(f"/update_stock/{product_id}", data={"stock": "5"})
+    with app.app_context():
+        assert stock(product_id) == 5
+        release_reservation(db.session.get(Order, order_id))
+        db.session.commit()
+        assert stock(product_id) == 8
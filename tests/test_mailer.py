@@ -0,0 +1,154 @@
+import socket
+from datetime import datetime
+from email import message_from_bytes
+
+import pytest
+from aiosmtpd.controller import Controller
+
+import mailer
+from mailer import _claim_batch, drain_outbox, enqueue_email
+from models import db, OutboundEmail
+
+
+class Inbox:
+    def __init__(self):
+        self.envelopes = []
+        self.hang_up_on = set()  # message numbers answered with 421, which closes the connection
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        if self.received in self.hang_up_on:
+            return "421 Service not available, closing transmission channel"
+        self.envelopes.append(envelope)
+        return "250 Message accepted for delivery"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    inbox = Inbox()
+    controller = Controller(inbox, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller, inbox
+    controller.stop()
+
+
+@pytest.fixture
+def app(make_app, smtp_server):
+    controller, _ = smtp_server
+    return make_app(
+        MAIL_SERVER=controller.hostname,
+        MAIL_PORT=controller.port,
+        MAIL_USE_TLS=False,
+        MAIL_DEFAULT_SENDER="shop@example.com",
+    )
+
+
+def queue(count):
+    emails = [enqueue_email(f"buyer{i}@example.com", "Your order", "<p>Thanks!</p>") for i in range(count)]
+    db.session.commit()
+    return [email.id for email in emails]
+
+
+def outbox(ids):
+    db.session.expire_all()
+    return [db.session.get(OutboundEmail, email_id) for email_id in ids]
+
+
+def test_drain_outbox_delivers_and_marks_sent(app, smtp_server):
+    _, inbox = smtp_server
+    with app.app_context():
+        email = enqueue_email("buyer@example.com", "Your order", "<p>Thanks!</p>")
+        db.session.commit()
+
+        assert drain_outbox() == 1
+
+        db.session.expire_all()
+        email = db.session.get(OutboundEmail, email.id)
+        assert email.status == "sent"
+        assert email.sent_at is not None
+        assert email.attempts == 0
+
+    assert len(inbox.envelopes) == 1
+    envelope = inbox.envelopes[0]
+    assert envelope.rcpt_tos == ["buyer@example.com"]
+    assert message_from_bytes(envelope.content)["Subject"] == "Your order"
+
+
+def test_drain_outbox_schedules_retry_when_smtp_is_down(make_app):
+    app = make_app(MAIL_SERVER="127.0.0.1", MAIL_PORT=free_port(), MAIL_USE_TLS=False,
+                   MAIL_DEFAULT_SENDER="shop@example.com")
+    with app.app_context():
+        email = enqueue_email("buyer@example.com", "Your order", "<p>Thanks!</p>")
+        db.session.commit()
+
+        assert drain_outbox() == 1
+
+        db.session.expire_all()
+        email = db.session.get(OutboundEmail, email.id)
+        assert email.status == "pending"
+        assert email.attempts == 1
+        assert email.last_error
+
+
+def test_dropped_connection_reconnects_once_and_carries_on(app, smtp_server):
+    _, inbox = smtp_server
+    inbox.hang_up_on = {2}
+    with app.app_context():
+        ids = queue(4)
+
+        assert drain_outbox() == 4
+
+        first, refused, third, fourth = outbox(ids)
+        assert [e.status for e in (first, third, fourth)] == ["sent"] * 3
+        assert [e.attempts for e in (first, third, fourth)] == [0] * 3
+        # Only the email the server refused is charged
+        assert (refused.status, refused.attempts) == ("pending", 1)
+
+    assert len(inbox.envelopes) == 3
+
+
+def test_relay_gone_mid_batch_postpones_the_rest_uncharged(app, smtp_server, monkeypatch):
+    _, inbox = smtp_server
+    inbox.hang_up_on = {2}
+    build_message = mailer._build_message
+
+    def build_then_lose_the_relay(email):
+        if email.id == ids[1]:
+            # The reconnect after this hang-up finds nobody listening
+            monkeypatch.setattr(app.extensions["mail"], "port", free_port())
+        return build_message(email)
+
+    monkeypatch.setattr(mailer, "_build_message", build_then_lose_the_relay)
+    with app.app_context():
+        ids = queue(4)
+
+        drain_outbox()
+
+        first, refused, *rest = outbox(ids)
+        assert first.status == "sent"
+        assert (refused.status, refused.attempts) == ("pending", 1)
+        assert [(e.status, e.attempts) for e in rest] == [("pending", 0)] * 2
+        assert all(e.next_attempt_at > datetime.utcnow() for e in rest)
+
+
+def test_claimed_emails_are_leased_not_locked(make_app):
+    app = make_app(MAIL_LEASE_SECONDS=600)
+    with app.app_context():
+        ids = queue(2)
+
+        assert [e.id for e in _claim_batch(10)] == ids
+        # Another worker finds nothing due until the lease runs out
+        assert _claim_batch(10) == []
+
+    expired = make_app(MAIL_LEASE_SECONDS=0)
+    with expired.app_context():
+        ids = queue(1)
+        _claim_batch(10)
+        assert [e.id for e in _claim_batch(10)] == ids
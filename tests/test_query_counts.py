@@ -0,0 +1,121 @@
+import os
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from conftest import add_product, add_user, log_in
+from invoices import invoice_path
+from models import db, Order, OrderItem
+
+
+@contextmanager
+def count_queries(app):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def add_orders(app, user_id, count, items_per_order=3):
+    """Create ``count`` paid orders for ``user_id``; returns their ids."""
+    with app.app_context():
+        product = add_product()
+        orders = []
+        for _ in range(count):
+            order = Order(user_id=user_id, total=29.97, is_paid=True)
+            order.order_items = [
+                OrderItem(product_id=product.id, product_name=product.name, quantity=1, price=product.price)
+                for _ in range(items_per_order)
+            ]
+            db.session.add(order)
+            orders.append(order)
+        db.session.commit()
+        return [order.id for order in orders]
+
+
+def cache_invoice(app, order_id):
+    # Stand in for an earlier WeasyPrint render; the routes then only stream the file
+    with app.test_request_context():
+        path = invoice_path(db.session.get(Order, order_id))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+
+
+def queries_for(app, client, url, **kwargs):
+    with count_queries(app) as statements:
+        response = client.get(url, **kwargs)
+    return response, len(statements)
+
+
+@pytest.fixture
+def user_id(app):
+    with app.app_context():
+        return add_user(is_admin=True).id
+
+
+# Every request also loads the logged-in user (Flask-Login's user_loader) once
+@pytest.mark.parametrize(
+    "url, budget",
+    [
+        ("/orders", 3),  # user, ETag validators, orders
+        ("/dashboard", 2),  # user, orders
+        ("/admin/orders", 2),  # user, orders joined to their users
+    ],
+)
+def test_order_lists_run_constant_queries(app, client, user_id, url, budget):
+    log_in(client, user_id)
+
+    add_orders(app, user_id, 1)
+    response, one = queries_for(app, client, url)
+    assert response.status_code == 200
+    add_orders(app, user_id, 20)
+    response, many = queries_for(app, client, url)
+    assert response.status_code == 200
+
+    assert one == many == budget
+
+
+@pytest.mark.parametrize(
+    "url, budget",
+    [
+        ("/order/{id}", 3),  # user, order, its items
+        ("/order/{id}/invoice", 3),  # user, order, its items (for the cache key)
+        ("/order/{id}/invoice/pdf", 3),
+    ],
+)
+def test_single_order_pages_run_constant_queries(app, client, user_id, url, budget):
+    log_in(client, user_id)
+    small, = add_orders(app, user_id, 1, items_per_order=1)
+    large, = add_orders(app, user_id, 1, items_per_order=25)
+    cache_invoice(app, small)
+    cache_invoice(app, large)
+
+    response, one = queries_for(app, client, url.format(id=small))
+    assert response.status_code == 200
+    response, many = queries_for(app, client, url.format(id=large))
+    assert response.status_code == 200
+
+    assert one == many == budget
+
+
+@pytest.mark.parametrize("url", ["/order/{id}", "/order/{id}/invoice"])
+def test_revalidation_skips_the_items(app, client, user_id, url):
+    log_in(client, user_id)
+    order_id, = add_orders(app, user_id, 1)
+    cache_invoice(app, order_id)
+    etag = client.get(url.format(id=order_id)).headers["ETag"]
+
+    response, queries = queries_for(app, client, url.format(id=order_id), headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert queries == 2  # user, order
@@ -0,0 +1,75 @@
+from conftest import add_product, add_user, log_in
+from models import db
+from search import index_product, search_products
+
+
+def test_admin_added_product_is_searchable_on_a_create_all_database(app, client):
+    with app.app_context():
+        log_in(client, add_user(is_admin=True).id)
+
+    response = client.post(
+        "/admin/add_product", data={"name": "Blue Widget", "price": "3.50", "description": "Shiny"}
+    )
+    assert response.status_code == 302
+
+    page = client.get("/search?q=wid").get_data(as_text=True)
+    assert "Blue Widget" in page
+
+
+def seed(*products):
+    """Add ``(name, description)`` products and index them; returns their ids."""
+    ids = []
+    for name, description in products:
+        product = add_product(name=name)
+        product.description = description
+        index_product(product)
+        db.session.commit()
+        ids.append(product.id)
+    return ids
+
+
+def names(page):
+    return [product.name for product in page.items]
+
+
+def test_name_matches_rank_above_description_matches(app):
+    with app.app_context():
+        # The description-only match is older, so id order alone would put it first
+        seed(("Desk", "Comes with a reading lamp"), ("Lamp", "Brass, 40 cm"))
+
+        assert names(search_products("lamp")) == ["Lamp", "Desk"]
+
+
+def test_terms_are_prefixes_and_all_must_match(app):
+    with app.app_context():
+        seed(("Desk", "Comes with a reading lamp"), ("Lamp", "Brass, 40 cm"), ("Rug", "Wool"))
+
+        assert sorted(names(search_products("lam"))) == ["Desk", "Lamp"]
+        assert names(search_products("bras LAM")) == ["Lamp"]
+        assert names(search_products('lamp" OR rug*')) == []  # FTS5 syntax is not interpreted
+        assert search_products("  ").items == []
+
+
+def test_has_next_pages_through_per_page_plus_one(app):
+    with app.app_context():
+        seed(*[(f"Widget {i}", "") for i in range(4)])
+
+        first = search_products("widget", page=1, per_page=3)
+        second = search_products("widget", page=2, per_page=3)
+
+        assert (len(first.items), first.has_next) == (3, True)
+        assert (len(second.items), second.has_next) == (1, False)
+        assert not set(names(first)) & set(names(second))
+
+
+def test_page_is_clamped_to_search_max_pages(make_app):
+    app = make_app(SEARCH_MAX_PAGES=2)
+    with app.app_context():
+        seed(*[(f"Widget {i}", "") for i in range(10)])
+
+        last = search_products("widget", page=99, per_page=3)
+
+        assert last.page == 2
+        assert len(last.items) == 3
+        assert not last.has_next  # more matches exist, but no deeper page is served
+        assert search_products("widget", page=0, per_page=3).page == 1
@@ -0,0 +1,46 @@
+import pytest
+
+from conftest import add_user, log_in
+from models import db, Order, OutboundEmail
+
+
+def add_order(user_id, is_paid):
+    order = Order(user_id=user_id, total=9.99, is_paid=is_paid, shipping_status="Processing")
+    db.session.add(order)
+    db.session.commit()
+    return order.id
+
+
+@pytest.fixture
+def orders(app, client):
+    """A paid and an unpaid order, with an admin logged in."""
+    with app.app_context():
+        buyer_id = add_user().id
+        log_in(client, add_user("admin", is_admin=True).id)
+        return add_order(buyer_id, is_paid=True), add_order(buyer_id, is_paid=False)
+
+
+def shipping_status(order_id):
+    db.session.expire_all()
+    return db.session.get(Order, order_id).shipping_status
+
+
+def test_bulk_update_skips_unpaid_orders(app, client, orders):
+    paid, unpaid = orders
+
+    client.post("/admin/update_shipping/bulk", data={"status": "Shipped", "order_ids": [paid, unpaid]})
+
+    with app.app_context():
+        assert shipping_status(paid) == "Shipped"
+        assert shipping_status(unpaid) == "Processing"
+        assert db.session.query(OutboundEmail).count() == 1
+
+
+def test_single_update_refuses_an_unpaid_order(app, client, orders):
+    _, unpaid = orders
+
+    client.post(f"/admin/update_shipping/{unpaid}", data={"status": "Shipped"})
+
+    with app.app_context():
+        assert shipping_status(unpaid) == "Processing"
+        assert db.session.query(OutboundEmail).count() == 0
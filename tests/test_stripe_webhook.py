@@ -0,0 +1,142 @@
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import orders
+import payments
+from conftest import add_user
+from models import db, Order, OutboundEmail, StripeEvent
+from payments import drain_stripe_events
+
+SECRET = "whsec_test"
+
+
+@pytest.fixture
+def app(make_app, monkeypatch):
+    monkeypatch.setattr(payments, "prerender_invoice", lambda order: None)
+    return make_app(STRIPE_WEBHOOK_SECRET=SECRET, STRIPE_SECRET_KEY="sk_test")
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    # The worker "dies" right after acknowledging: nothing submitted ever runs
+    calls = []
+    monkeypatch.setattr(orders, "submit", lambda fn, *args: calls.append((fn, args)))
+    return calls
+
+
+def deliver(client, event):
+    payload = json.dumps(event)
+    timestamp = int(time.time())
+    signature = hmac.new(SECRET.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256).hexdigest()
+    return client.post(
+        "/stripe/webhook",
+        data=payload,
+        content_type="application/json",
+        headers={"Stripe-Signature": f"t={timestamp},v1={signature}"},
+    )
+
+
+def completed(event_id="evt_1", session_id="cs_1", **session):
+    return {
+        "id": event_id,
+        "object": "event",
+        "type": "checkout.session.completed",
+        "data": {"object": {"id": session_id, "object": "checkout.session", **session}},
+    }
+
+
+def add_order(session_id="cs_1"):
+    user = add_user()
+    order = Order(user_id=user.id, total=9.99, reservation_status="reserved", stripe_session_id=session_id)
+    db.session.add(order)
+    db.session.commit()
+    return order.id
+
+
+def test_event_survives_a_crash_after_acknowledging(app, client, submitted):
+    with app.app_context():
+        order_id = add_order()
+
+    response = deliver(client, completed(payment_status="paid"))
+
+    assert response.status_code == 200
+    assert len(submitted) == 1
+    with app.app_context():
+        assert db.session.get(StripeEvent, "evt_1").status == "pending"
+        assert not db.session.get(Order, order_id).is_paid
+
+        assert drain_stripe_events() == 1
+
+        assert db.session.get(StripeEvent, "evt_1").status == "processed"
+        order = db.session.get(Order, order_id)
+        assert order.is_paid
+        assert order.reservation_status == "confirmed"
+        assert db.session.query(OutboundEmail).count() == 1
+        assert drain_stripe_events() == 0
+
+
+def test_redelivery_is_stored_and_applied_once(app, client, submitted):
+    with app.app_context():
+        add_order()
+
+    assert deliver(client, completed(payment_status="paid")).status_code == 200
+    assert deliver(client, completed(payment_status="paid")).status_code == 200
+
+    assert len(submitted) == 1
+    with app.app_context():
+        assert db.session.query(StripeEvent).count() == 1
+        assert payments.process_stripe_event("evt_1")
+        assert not payments.process_stripe_event("evt_1")
+        assert db.session.query(OutboundEmail).count() == 1
+
+
+def test_missing_payment_status_is_not_a_server_error(app, client, submitted):
+    with app.app_context():
+        order_id = add_order()
+
+    assert deliver(client, completed()).status_code == 200
+
+    with app.app_context():
+        drain_stripe_events()
+        assert db.session.get(StripeEvent, "evt_1").status == "processed"
+        assert not db.session.get(Order, order_id).is_paid
+
+
+def test_event_for_an_unsaved_session_is_retried(app, client, submitted):
+    with app.app_context():
+        order_id = add_order(session_id=None)
+
+    deliver(client, completed(payment_status="paid"))
+
+    with app.app_context():
+        drain_stripe_events()
+        event = db.session.get(StripeEvent, "evt_1")
+        assert (event.status, event.attempts) == ("pending", 1)
+        assert event.next_attempt_at > datetime.utcnow()
+
+        # checkout() saves the session id; the retry comes due
+        db.session.get(Order, order_id).stripe_session_id = "cs_1"
+        event.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        drain_stripe_events()
+
+        assert db.session.get(StripeEvent, "evt_1").status == "processed"
+        assert db.session.get(Order, order_id).is_paid
+
+
+def test_bad_signature_is_rejected(app, client, submitted):
+    response = client.post(
+        "/stripe/webhook",
+        data=json.dumps(completed()),
+        content_type="application/json",
+        headers={"Stripe-Signature": "t=1,v1=deadbeef"},
+    )
+
+    assert response.status_code == 400
+    with app.app_context():
+        assert db.session.query(StripeEvent).count() == 0
@@ -0,0 +1,111 @@
+import threading
+from dataclasses import dataclass
+
+from flask import current_app
+from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from fragment_cache import LRUCache
+from metrics import USER_CACHE_REQUESTS
+from models import db, User
+
+# 👤 Flask-Login calls load_user() on every authenticated request. Instead of
+# a User row per request, serve a small immutable principal from a per-worker
+# TTL cache. Any flush that changes or deletes a User drops its entry (again
+# once the transaction commits); other workers catch up within the TTL.
+
+
+@dataclass(frozen=True, eq=False)
+class UserPrincipal(UserMixin):
+    """The logged-in user as views and templates read it, detached from any session.
+
+    Frozen so one cached instance can be shared by concurrent requests;
+    code that changes the user loads the ``User`` row instead.
+    """
+
+    id: int
+    username: str
+    email: str
+    is_admin: bool
+    avatar: str
+
+
+_COLUMNS = (User.id, User.username, User.email, User.is_admin, User.avatar)
+
+_cache = None
+_cache_lock = threading.Lock()
+_stats = {"hit": 0, "miss": 0}
+
+
+def _get_cache():
+    # Built lazily from config so each gunicorn worker gets its own LRU
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LRUCache(
+                    maxsize=current_app.config["USER_CACHE_SIZE"],
+                    ttl=current_app.config["USER_CACHE_TTL"],
+                )
+    return _cache
+
+
+def _fetch(user_id):
+    row = db.session.execute(db.select(*_COLUMNS).where(User.id == user_id)).first()
+    return UserPrincipal(*row) if row else None
+
+
+def load_principal(user_id):
+    """The principal for ``user_id``, or None if there is no such user."""
+    if current_app.config["USER_CACHE_TTL"] <= 0:
+        return _fetch(user_id)
+
+    cache = _get_cache()
+    principal = cache.get(user_id)
+    result = "miss" if principal is None else "hit"
+    _stats[result] += 1
+    USER_CACHE_REQUESTS.labels(result).inc()
+    if principal is None:
+        principal = _fetch(user_id)
+        if principal is not None:
+            cache.set(user_id, principal)
+    return principal
+
+
+def invalidate(user_id):
+    if _cache is not None:
+        _cache.delete(user_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed_users(session, flush_context):
+    changed = {obj.id for obj in (*session.dirty, *session.deleted) if isinstance(obj, User)}
+    for user_id in changed:
+        invalidate(user_id)
+    if changed:
+        # A request in this worker may re-cache the old row before we commit
+        session.info.setdefault("changed_user_ids", set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session):
+    for user_id in session.info.pop("changed_user_ids", ()):
+        invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_users(session):
+    session.info.pop("changed_user_ids", None)
+
+
+def cache_stats():
+    """Hit/miss counts for this worker, for /admin/perf."""
+    total = _stats["hit"] + _stats["miss"]
+    return {
+        "ttl": current_app.config["USER_CACHE_TTL"],
+        "entries": len(_cache) if _cache is not None else 0,
+        "hits": _stats["hit"],
+        "misses": _stats["miss"],
+        "hit_rate": _stats["hit"] / total if total else None,
+    }
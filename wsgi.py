@@ -4,4 +4,15 @@ import os
 # ✅ Ensure the current directory is on the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app import app  # ✅ this will now work
+from app import create_app
+from compression import CompressionMiddleware
+
+app = create_app()
+
+# 🗜️ Brotli/gzip for rendered HTML and JSON (gunicorn serves wsgi:app)
+app.wsgi_app = CompressionMiddleware(
+    app.wsgi_app,
+    min_size=app.config["COMPRESSION_MIN_SIZE"],
+    gzip_level=app.config["COMPRESSION_GZIP_LEVEL"],
+    brotli_quality=app.config["COMPRESSION_BROTLI_QUALITY"],
+)